@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     14.03.2020
-@modified    03.12.2024
+@modified    17.10.2026
 ------------------------------------------------------------------------------
 """
 import datetime
@@ -1615,7 +1615,8 @@ def build(plugin, panel):
             return result
 
         def handler(event):
-            value = event.EventObject.Value
+            value = event.EventObject.Value if not isinstance(ctrl, wx.Choice) else \
+                    event.EventObject.StringSelection
             if isinstance(ctrl, wx.SpinCtrlDouble): value = int(value)
             state  = plugin.state() if callable(getattr(plugin, "state", None)) else {}
             row    = state[rowindex] if rowindex is not None and isinstance(state, list) else state
@@ -1780,17 +1781,23 @@ def build(plugin, panel):
                         if prop.get("orderable"): v = "%s. %s" % (i + 1, v)
                         c0 = wx.StaticText(panel, label=v, name="%s_%s_label" % (plugin.name, i))
                         sizer.Add(c0, pos=(count, 0), flag=wx.ALIGN_CENTER_VERTICAL)
-                    elif "combo" == itemprop.get("type"):
+                    elif itemprop.get("type") in ("combo", "choice"):
                         choices = itemprop["choices"]
                         if isinstance(choices, dict): choices = list(choices.values())
                         if prop.get("nullable") and "" not in choices: choices = [""] + choices
                         if v and v not in choices: choices = [v] + choices
-                        c = wx.ComboBox(panel, style=wx.CB_DROPDOWN | wx.CB_READONLY,
-                                        name="%s_%s" % (plugin.name, i))
+                        ctrlname = "%s_%s" % (plugin.name, i)
+                        if "choice" == itemprop["type"]: # Plain dropdown, faster than combobox
+                            c = wx.Choice(panel, name=ctrlname)
+                        else:
+                            c = wx.ComboBox(panel, style=wx.CB_DROPDOWN | wx.CB_READONLY,
+                                            name=ctrlname)
                         c.SetItems(choices)
-                        if v is not None: c.Value = v
-                        elif "" in choices: c.Value = ""
-                        c.Bind(wx.EVT_COMBOBOX, make_value_handler(c, itemprop, rowindex=i))
+                        if v is None and "" in choices: v = ""
+                        if v is not None and "choice" == itemprop["type"]: c.SetStringSelection(v)
+                        elif v is not None: c.Value = v
+                        c.Bind(wx.EVT_CHOICE if "choice" == itemprop["type"] else wx.EVT_COMBOBOX,
+                               make_value_handler(c, itemprop, rowindex=i))
                         bsizer.Add(c, flag=wx.GROW)
                     elif "number" == itemprop.get("type"):
                         c = wx.SpinCtrlDouble(panel, name=itemprop["name"],
@@ -1890,22 +1897,27 @@ def build(plugin, panel):
             count += 1
 
 
-        elif "combo" == prop.get("type"):
+        elif prop.get("type") in ("combo", "choice"):
             c1 = wx.StaticText(panel, label="%s: " % prop.get("label", prop["name"]),
                                name="%s_label" % prop["name"])
-            c2 = wx.ComboBox(panel, style=wx.CB_DROPDOWN | wx.CB_READONLY, name=prop["name"])
+            if "choice" == prop["type"]: # Plain dropdown, faster than readonly combobox
+                c2 = wx.Choice(panel, name=prop["name"])
+            else:
+                c2 = wx.ComboBox(panel, style=wx.CB_DROPDOWN | wx.CB_READONLY, name=prop["name"])
 
             v = state[prop["name"]]
-            choices = prop["choices"]
-            if isinstance(choices, dict):
-                choices = list(choices.values())
+            choices = list(prop["choices"])
+            if isinstance(prop["choices"], dict):
+                choices = list(prop["choices"].values())
                 v = next((y for x, y in prop["choices"].items() if v == x), v)
             if prop.get("nullable") and "" not in choices: choices = [""] + choices
             if v and v not in choices: choices = [v] + choices
             c2.SetItems(choices)
-            if v is not None: c2.Value = v
+            if v is not None and "choice" == prop["type"]: c2.SetStringSelection(v)
+            elif v is not None: c2.Value = v
             if prop.get("readonly"): c2.Enable(False)
-            c2.Bind(wx.EVT_COMBOBOX, make_value_handler(c2, prop))
+            c2.Bind(wx.EVT_CHOICE if "choice" == prop["type"] else wx.EVT_COMBOBOX,
+                    make_value_handler(c2, prop))
 
             sizer.Add(c1, pos=(count, 0), flag=wx.ALIGN_CENTER_VERTICAL)
             sizer.Add(c2, pos=(count, 1), flag=wx.GROW)
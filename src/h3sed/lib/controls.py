@@ -25,7 +25,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     14.03.2020
-@modified    03.12.2024
+@modified    17.10.2026
 ------------------------------------------------------------------------------
 """
 import collections
@@ -281,12 +281,13 @@ class ColourManager(object):
         """
         Ensures foreground and background system colours on control and its descendant controls.
 
-        Explicitly sets background colour on ComboBox, SpinCtrl and TextCtrl,
+        Explicitly sets background colour on Choice, ComboBox, SpinCtrl and TextCtrl,
         and foreground colour on wx.CheckBox (workaround for dark mode in Windows 10+).
         """
         if "nt" != os.name or sys.getwindowsversion() < (10, ): return
 
-        PROPS = {wx.ComboBox:       {"BackgroundColour": wx.SYS_COLOUR_WINDOW},
+        PROPS = {wx.Choice:         {"BackgroundColour": wx.SYS_COLOUR_WINDOW},
+                 wx.ComboBox:       {"BackgroundColour": wx.SYS_COLOUR_WINDOW},
                  wx.SpinCtrl:       {"BackgroundColour": wx.SYS_COLOUR_WINDOW},
                  wx.SpinCtrlDouble: {"BackgroundColour": wx.SYS_COLOUR_WINDOW},
                  wx.TextCtrl:       {"BackgroundColour": wx.SYS_COLOUR_WINDOW},
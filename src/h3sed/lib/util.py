@@ -7,12 +7,13 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     19.11.2011
-@modified    03.12.2024
+@modified    17.10.2026
 ------------------------------------------------------------------------------
 """
 import codecs
 import csv
 import ctypes
+import inspect
 import locale
 import math
 import os
@@ -36,6 +37,9 @@ except Exception: text_types = (str, )  # Py3
 try: string_type = unicode              # Py2
 except Exception: string_type = str     # Py3
 
+# Precompiled little-endian unsigned integer formats, as {byte length: struct.Struct}
+INT_STRUCTS = {n: struct.Struct(f) for n, f in [(1, "<B"), (2, "<H"), (4, "<L"), (8, "<Q")]}
+
 
 class csv_writer(object):
     """Convenience wrapper for csv.Writer, with Python2/3 compatbility."""
@@ -99,8 +103,7 @@ def add_unique(lst, item, direction=1, maxlen=sys.maxsize):
 
 def bytoi(blob):
     """Converts a string of bytes or a bytearray to unsigned integer."""
-    fmt = {1: "<B", 2: "<H", 4: "<L", 8: "<Q"}[len(blob)]
-    return struct.unpack(fmt, blob)[0]
+    return INT_STRUCTS[len(blob)].unpack(blob)[0]
 
 
 def canonic_version(v):
@@ -176,12 +179,19 @@ def get(collection, *path, **kwargs):
     return result
 
 
+def has_argument(func, name):
+    """Returns whether function or method accepts an argument of given name."""
+    try: spec = inspect.getfullargspec(func)              # Py3
+    except AttributeError: spec = inspect.getargspec(func)  # Py2
+    if getattr(spec, "varkw", None) or getattr(spec, "keywords", None): return True
+    return name in spec.args or name in (getattr(spec, "kwonlyargs", None) or ())
+
+
 def itoby(v, length):
     """
     Converts an unsigned integer to a bytearray of specified length.
     """
-    fmt = {1: "<B", 2: "<H", 4: "<L", 8: "<Q"}[length]
-    return bytearray(struct.pack(fmt, v))
+    return bytearray(INT_STRUCTS[length].pack(v))
 
 
 def longpath(path):
@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created     22.03.2020
-@modified    04.12.2024
+@modified    17.10.2026
 ------------------------------------------------------------------------------
 """
 from collections import defaultdict, OrderedDict
@@ -1253,9 +1253,10 @@ Store.add("artifacts", Artifacts)
 Store.add("artifacts", Artifacts, category="inventory")
 Store.add("artifacts", ["Spellbook", "The Grail"], category="inventory")
 Store.add("artifacts", ScrollArtifacts, category="scroll")
-for slot in set(sum(ArtifactSlots.values(), [])):
-    Store.add("artifacts", [k for k, v in ArtifactSlots.items() if v[0] == slot],
-              category=slot)
+slotartifacts = {x: [] for slots in ArtifactSlots.values() for x in slots}
+for name, slots in ArtifactSlots.items(): slotartifacts[slots[0]].append(name)
+for slot, names in slotartifacts.items():
+    Store.add("artifacts", names, category=slot)
 
 Store.add("artifact_slots",    ArtifactSlots)
 Store.add("artifact_spells",   ArtifactSpells)
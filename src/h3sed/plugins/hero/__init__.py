@@ -48,7 +48,11 @@ Subplugin instances are expected to have the following API:
         '''Mandatory. Returns subplugin state parsed from hero bytearray, current or original.'''
 
     def serialize(self):
-        '''Mandatory. Returns new hero bytearray from subplugin state.'''
+        '''
+        Mandatory. Returns new hero bytearray from subplugin state.
+        Can take optional keyword argument `out` as a bytearray to write into,
+        instead of a copy of current hero bytes.
+        '''
 
     def render(self):
         '''
@@ -74,7 +78,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   14.03.2020
-@modified  03.12.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import collections
@@ -171,6 +175,9 @@ POS = {
 
 }
 
+# Value of a blank 4-byte spot in hero bytearray, as unsigned integer
+BLANK_ID = util.bytoi(metadata.Blank * 4)
+
 # Since savefile format is unknown, hero structs are identified heuristically,
 # by matching byte patterns.
 RGX_HERO = re.compile(b"""
@@ -205,12 +212,12 @@ RGX_HERO = re.compile(b"""
                              # Blank spots:   FF FF FF FF XY XY XY XY
                              # Artifacts:     XY 00 00 00 FF FF FF FF
                              # Scrolls:       XY 00 00 00 00 00 00 00
-    (?P<artifacts>(          # Catapult etc:  XY 00 00 00 XY XY 00 00
-      (\xFF{4} .{4}) | (.\x00{3} (\x00{4} | \xFF{4})) | (.\x00{3}.{2}\x00{2})
+    (?P<artifacts>(?:        # Catapult etc:  XY 00 00 00 XY XY 00 00
+      \xFF{4} .{4} | .\x00{3} (?: \xFF{4} | .{2}\x00{2})
     ){19})
 
                              # 512 bytes: 64 8-byte artifacts in backpack      503-1014
-    ( ((.\x00{3}) | \xFF{4}){2} ){64}
+    (?: (?: .\x00{3} | \xFF{4} ){2} ){64}
 
                              # 10 bytes: slots taken by combination artifacts 1015-1024
     .[\x00-\x01]{6}[\x00-\x02][\x00-\x01][\x00-\x05]
@@ -235,6 +242,13 @@ def factory(savefile, panel, commandprocessor):
     return HeroPlugin(savefile, panel, commandprocessor)
 
 
+def copy_state(state):
+    """Returns a copy of subplugin state, shallow if state is a flat list like inventory."""
+    if isinstance(state, list) and not any(isinstance(x, (dict, list)) for x in state):
+        return list(state)
+    return copy.deepcopy(state)
+
+
 
 class Hero(object):
     """
@@ -270,7 +284,7 @@ class Hero(object):
     def get_bytes(self, original=False):
         """Returns hero bytearray, current or original."""
         if not original: return copy.copy(self.bytes)
-        return bytearray(self.savefile.raw0[self.span[0]:self.span[1]])
+        return bytearray(memoryview(self.savefile.raw0)[self.span[0]:self.span[1]])
 
     def ensure_basestats(self, clear=False):
         """Populates internal hero stats without artifacts, if not already populated."""
@@ -542,7 +556,7 @@ class HeroPlugin(object):
                 hero.yamls1[:], hero.yamls2[:] = (hero.yamls2 or hero.yamls1), []
                 for p in self._plugins if hero.state0 else ():
                     if hasattr(hero, p["name"]):
-                        hero.state0[p["name"]] = copy.deepcopy(getattr(hero, p["name"]))
+                        hero.state0[p["name"]] = copy_state(getattr(hero, p["name"]))
                 page = next((p for p, i in self._pages.items() if i == index), None)
                 if page is not None:
                     heroes_open.append(hero)
@@ -904,7 +918,7 @@ class HeroPlugin(object):
             do_state0 = not self._hero.state0
             for p in self._plugins:
                 self.render_plugin(p["name"], reload=True, log=not page_existed)
-                if do_state0: self._hero.state0[p["name"]] = copy.deepcopy(p["instance"].state())
+                if do_state0: self._hero.state0[p["name"]] = copy_state(p["instance"].state())
 
         finally:
             if self._pages_visited[-1:] != [index]: self._pages_visited.append(index)
@@ -969,20 +983,21 @@ class HeroPlugin(object):
 
         # Jump over potential campaign carry-over heroes, stored in savefile with their
         # original armies+artifacts; the structs used by game come later.
-        pos = 30000
-        m = re.search(RGX, self.savefile.raw[pos:])
+        # Search by position: slicing the savefile buffer would copy it on every search.
+        raw, pos = self.savefile.raw, 30000
+        m = RGX.search(raw, pos)
         while m:
             start, end = m.span()
             if rgx_strip.match(m.group("name")) and not rgx_nulls.match(m.group("artifacts")):
-                blob = bytearray(self.savefile.raw[pos + start:pos + end])
+                blob = bytearray(raw[start:end])
                 name = util.to_unicode(rgx_strip.match(m.group("name")).group(1))
-                hero = Hero(name, blob, len(heroes), (start + pos, end + pos), self.savefile)
+                hero = Hero(name, blob, len(heroes), (start, end), self.savefile)
                 heroes.append(hero)
-                pos += end
+                pos = end
             else:
-                pos += start + 1
+                pos = start + 1
             # Continue in small chunks once heroes section reached, regex can get slow for remainder
-            m = re.search(RGX, self.savefile.raw[pos:pos+5000])
+            m = RGX.search(raw, pos, pos + 5000)
 
         logger.info("%s heroes detected in %s as version '%s'.",
                     len(heroes) or "No ", self.savefile.filename, self.savefile.version)
@@ -1138,9 +1153,15 @@ class HeroPlugin(object):
 
     def patch(self):
         """Serializes current plugin state to hero bytes, patches savefile binary."""
+        result = bytearray(self._hero.bytes)  # Plugins taking out-argument write into one copy
         for p in self._plugins:
-            if callable(getattr(p.get("instance"), "serialize", None)):
-                self._hero.bytes = p["instance"].serialize()
+            serialize = getattr(p.get("instance"), "serialize", None)
+            if not callable(serialize): continue # for p
+            if util.has_argument(serialize, "out"): result = serialize(out=result)
+            else:  # Plugin serializes from current hero bytes into a new copy
+                self._hero.bytes = type(self._hero.bytes)(result)
+                result = bytearray(serialize())
+        self._hero.bytes = type(self._hero.bytes)(result)  # Retain type hero bytes loaded with
         self.savefile.patch(self._hero.bytes, self._hero.span)
         self.populate_hero_yamls(self._hero, parse=True)
         self.populate_hero_yamls(self._hero, changes=True)
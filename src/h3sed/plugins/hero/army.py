@@ -7,10 +7,11 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   21.03.2020
-@modified  02.12.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import logging
+import struct
 
 import wx
 
@@ -73,19 +74,31 @@ class ArmyPlugin(object):
         self._panel    = panel  # Plugin contents panel
         self._state    = []     # [{"name": "Roc", "count": 6}, {}, ]
         self._ctrls    = []     # [{"name": wx.ComboBox, "count": wx.SpinCtrlDouble}, ]
+        self._items    = []     # Last items set to creature controls, as [("", "Angel", ..), ]
+        self._cachever = None   # Savefile version that lookup tables were cached for
+        self._ids      = {}     # Cached {creature name: creature ID} for current version
+        self._names    = {}     # Cached {creature ID: creature name} for current version
+        self._cmap     = {}     # Cached {lowercase name: creature name} for current version
+        self._pos      = {}     # Hero byte positions adapted for savefile, as of last parse
+        self._props    = None   # Cached props() result, cleared on version change
+        self._choices  = ()     # Cached creature choices for controls, as ("", "Air Elemental", ..)
+        self._choiceset = frozenset()  # Cached creature choices as set, for value lookups
 
 
     def props(self):
         """Returns props for army-tab, as [{type: "itemlist", ..}]."""
-        result = []
-        cc = sorted(metadata.Store.get("creatures", self._savefile.version))
-        for prop in UIPROPS:
-            myprop = dict(prop, item=[])
-            for item in prop["item"]:
-                myitem = dict(item, choices=cc) if "choices" in item else item
-                myprop["item"].append(myitem)
-            result.append(myprop)
-        return result
+        if self._props is None:
+            result = []
+            cc = sorted(metadata.Store.get("creatures", self._savefile.version))
+            for prop in UIPROPS:
+                myprop = dict(prop, item=[])
+                for item in prop["item"]:
+                    myitem = dict(item, choices=cc) if "choices" in item else item
+                    myprop["item"].append(myitem)
+                result.append(myprop)
+            self._props, self._choices = result, ("", ) + tuple(cc)
+            self._choiceset = frozenset(self._choices)
+        return self._props
 
 
     def state(self):
@@ -111,8 +124,8 @@ class ArmyPlugin(object):
     def load_state(self, state):
         """Loads plugin state from given data, ignoring unknown values. Returns whether state changed."""
         MYPROPS = self.props()
-        state0 = type(self._state)(self._state)
-        cmap = {x.lower(): x for x in metadata.Store.get("creatures", self._savefile.version)}
+        state0 = self._state[:]
+        cmap = self._cmap
         countitem = next(x for x in MYPROPS[0]["item"] if "count" == x.get("name"))
         MIN, MAX = countitem["min"], countitem["max"]
         state = state + [{}] * (MYPROPS[0]["max"] - len(state))
@@ -122,9 +135,9 @@ class ArmyPlugin(object):
                 logger.warning("Invalid data type in army #%s: %r", i + 1, v)
                 continue  # for
             name, count = v and v.get("name"), v and v.get("count")
-            if name and hasattr(name, "lower") and name.lower() in cmap \
-            and isinstance(count, int) and MIN <= count <= MAX:
-                self._state[i] = {"name": cmap[name.lower()], "count": count}
+            name = cmap.get(name.lower()) if name and hasattr(name, "lower") else None
+            if name and isinstance(count, int) and MIN <= count <= MAX:
+                self._state[i] = {"name": name, "count": count}
             elif v:
                 logger.warning("Invalid army #%s: %r", i + 1, v)
         return state0 != self._state
@@ -138,7 +151,7 @@ class ArmyPlugin(object):
         """
         result, MYPROPS = False, self.props()
         if self._ctrls and all(all(x.values()) for x in self._ctrls):
-            cc = [""] + sorted(metadata.Store.get("creatures", self._savefile.version))
+            cc, ccset = self._choices, self._choiceset
             for i in range(len(self._state)):
                 creature = None
                 for prop in MYPROPS[0]["item"]:
@@ -146,14 +159,17 @@ class ArmyPlugin(object):
                     name, choices = prop["name"], cc
                     ctrl, value = self._ctrls[i][name], self._state[i].get(name)
                     if "choices" in prop:
-                        choices = ([value] if value and value not in cc else []) + cc
-                        if choices != ctrl.GetItems(): ctrl.SetItems(choices)
+                        choices = ((value, ) if value and value not in ccset else ()) + cc
+                        if choices != self._items[i]:
+                            ctrl.SetItems(list(choices))
+                            self._items[i] = choices
                         else: ctrl.Value = ""
                         creature = value
                     else: ctrl.Show(not creature if "window" == prop.get("type") else bool(creature))
                     if value is not None and hasattr(ctrl, "Value"): ctrl.Value = value
         else:
             self._ctrls, result = gui.build(self, self._panel)[0], True
+            self._items = [tuple(x["name"].GetItems()) for x in self._ctrls]
             # Hide count controls where no creature type selected
             for i in range(len(self._state)):
                 creature, size = None, None
@@ -210,17 +226,26 @@ class ArmyPlugin(object):
     def parse(self, heroes, original=False):
         """Returns army states parsed from hero bytearrays, as [[{name, count} or {}, ], ]."""
         result = []
-        NAMES = {x[y]: y for x in [metadata.Store.get("ids", self._savefile.version)]
-                 for y in metadata.Store.get("creatures", self._savefile.version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        version = self._savefile.version
+        if version != self._cachever:
+            ALLIDS = metadata.Store.get("ids", version)
+            CREATURES = metadata.Store.get("creatures", version)
+            self._ids   = {x: ALLIDS[x] for x in CREATURES}
+            self._names = {ALLIDS[x]: x for x in CREATURES}
+            self._cmap  = {x.lower(): x for x in CREATURES}
+            self._cachever, self._props = version, None  # Choices are rebuilt with props
+        self._pos = plugins.adapt(self, "pos", POS)  # Also depends on savefile format
+        NAMES, MYPOS = self._names, self._pos
+        COUNT = self.props()[0]["max"]
+        UNPACK = struct.Struct("<%sL" % COUNT).unpack_from  # Army slots as uint32 values
 
         for hero in heroes:
             values = []
             hero_bytes = hero.get_bytes(original=True) if original else hero.bytes
             for prop in self.props():
-                for i in range(prop["max"]):
-                    unit, count = (util.bytoi(hero_bytes[MYPOS[k]  + i * 4:MYPOS[k]  + i * 4 + 4])
-                                   for k in ("army_types", "army_counts"))
+                units  = UNPACK(hero_bytes, MYPOS["army_types"])
+                counts = UNPACK(hero_bytes, MYPOS["army_counts"])
+                for unit, count in zip(units, counts):
                     name = NAMES.get(unit)
                     if not count or not name: values.append({})
                     else: values.append({"name": name, "count": count})
@@ -228,14 +253,17 @@ class ArmyPlugin(object):
         return result
 
 
-    def serialize(self):
-        """Returns new hero bytearray, with edited army section."""
-        result = self._hero.bytes[:]
+    def serialize(self, out=None):
+        """
+        Returns new hero bytearray, with edited army section.
+
+        @param   out  bytearray of hero bytes to write into, if not copying current hero bytes
+        """
+        result = bytearray(self._hero.bytes) if out is None else out
         bytes0 = self._hero.get_bytes(original=True)
 
-        IDS = {y: x[y] for x in [metadata.Store.get("ids", self._savefile.version)]
-               for y in metadata.Store.get("creatures", self._savefile.version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        IDS = self._ids
+        POS1, POS2 = self._pos["army_types"], self._pos["army_counts"]
 
         state0 = self._hero.state0.get("army") or []
         for prop in self.props():
@@ -243,14 +271,14 @@ class ArmyPlugin(object):
                 name, count = (self._state[i].get(x) for x in ("name", "count"))
                 if (not name or not count) and i < len(state0) and not state0[i].get("name"):
                     # Retain original bytes unchanged, as game uses both 0x00 and 0xFF
-                    b1 = bytes0[MYPOS["army_types"]  + i * 4:MYPOS["army_types"]  + i * 4 + 4]
-                    b2 = bytes0[MYPOS["army_counts"] + i * 4:MYPOS["army_counts"] + i * 4 + 4]
+                    b1 = bytes0[POS1 + i * 4:POS1 + i * 4 + 4]
+                    b2 = bytes0[POS2 + i * 4:POS2 + i * 4 + 4]
                 else:
                     b1, b2 = metadata.Blank * 4, metadata.Null * 4
                     if count and name in IDS:
                         b1 = util.itoby(IDS[name], 4)
                         b2 = util.itoby(count,     4)
-                result[MYPOS["army_types"]  + i * 4:MYPOS["army_types"]  + i * 4 + 4] = b1
-                result[MYPOS["army_counts"] + i * 4:MYPOS["army_counts"] + i * 4 + 4] = b2
+                result[POS1 + i * 4:POS1 + i * 4 + 4] = b1
+                result[POS2 + i * 4:POS2 + i * 4 + 4] = b2
 
         return result
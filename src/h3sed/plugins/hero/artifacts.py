@@ -7,11 +7,12 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   16.03.2020
-@modified  02.12.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
-from collections import defaultdict
+from collections import Counter, defaultdict
 import logging
+import struct
 
 import wx
 
@@ -20,7 +21,7 @@ from h3sed import gui
 from h3sed import metadata
 from h3sed import plugins
 from h3sed.lib import util
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import BLANK_ID, POS
 
 
 logger = logging.getLogger(__package__)
@@ -40,42 +41,42 @@ PROPS = {"name": "artifacts", "label": "Artifacts", "index": 3}
 UIPROPS = [{
     "name":     "helm",
     "label":    "Helm slot",
-    "type":     "combo",
+    "type":     "choice",
     "nullable": True,
     "choices":  None, # Populated later
     "info":     format_stats,
 }, {
     "name":     "neck",
     "label":    "Neck slot",
-    "type":     "combo",
+    "type":     "choice",
     "nullable": True,
     "choices":  None,
     "info":     format_stats,
 }, {
     "name":     "armor",
     "label":    "Armor slot",
-    "type":     "combo",
+    "type":     "choice",
     "nullable": True,
     "choices":  None,
     "info":     format_stats,
 }, {
     "name":     "weapon",
     "label":    "Weapon slot",
-    "type":     "combo",
+    "type":     "choice",
     "nullable": True,
     "choices":  None,
     "info":     format_stats,
 }, {
     "name":     "shield",
     "label":    "Shield slot",
-    "type":     "combo",
+    "type":     "choice",
     "nullable": True,
     "choices":  None,
     "info":     format_stats,
 }, {
     "name":     "lefthand",
     "label":    "Left hand slot",
-    "type":     "combo",
+    "type":     "choice",
     "slot":     "hand",
     "nullable": True,
     "choices":  None,
@@ -83,7 +84,7 @@ UIPROPS = [{
 }, {
     "name":     "righthand",
     "label":    "Right hand slot",
-    "type":     "combo",
+    "type":     "choice",
     "slot":     "hand",
     "nullable": True,
     "choices":  None,
@@ -91,21 +92,21 @@ UIPROPS = [{
 }, {
     "name":     "cloak",
     "label":    "Cloak slot",
-    "type":     "combo",
+    "type":     "choice",
     "nullable": True,
     "choices":  None,
     "info":     format_stats,
 }, {
     "name":     "feet",
     "label":    "Feet slot",
-    "type":     "combo",
+    "type":     "choice",
     "nullable": True,
     "choices":  None,
     "info":     format_stats,
 }, {
     "name":     "side1",
     "label":    "Side slot 1",
-    "type":     "combo",
+    "type":     "choice",
     "slot":     "side",
     "nullable": True,
     "choices":  None,
@@ -113,7 +114,7 @@ UIPROPS = [{
 }, {
     "name":     "side2",
     "label":    "Side slot 2",
-    "type":     "combo",
+    "type":     "choice",
     "slot":     "side",
     "nullable": True,
     "choices":  None,
@@ -121,7 +122,7 @@ UIPROPS = [{
 }, {
     "name":     "side3",
     "label":    "Side slot 3",
-    "type":     "combo",
+    "type":     "choice",
     "slot":     "side",
     "nullable": True,
     "choices":  None,
@@ -129,7 +130,7 @@ UIPROPS = [{
 }, {
     "name":     "side4",
     "label":    "Side slot 4",
-    "type":     "combo",
+    "type":     "choice",
     "slot":     "side",
     "nullable": True,
     "choices":  None,
@@ -137,7 +138,7 @@ UIPROPS = [{
 }, {
     "name":     "side5",
     "label":    "Side slot 5",
-    "type":     "combo",
+    "type":     "choice",
     "slot":     "side",
     "nullable": True,
     "choices":  None,
@@ -168,17 +169,34 @@ class ArtifactsPlugin(object):
         self._hero     = None
         self._panel    = panel  # Plugin contents panel
         self._state    = {}     # {"helm": "Skull Helmet", ..}
-        self._ctrls    = {}     # {"helm": wx.ComboBox, "helm-info": wx.StaticText, }
+        self._ctrls    = {}     # {"helm": wx.Choice, "helm-info": wx.StaticText, }
+        self._items    = {}     # Last items set to controls, as {"helm": ("", ..), }
+        self._infos    = {}     # Info controls by slot name, as {"helm": wx.StaticText, }
         self._cache    = {}     # Cached {slot: [..all choices..], ..}
+        self._cacheset = {}     # Cached {slot: set(..all choices..), ..}
+        self._cachever = None   # Savefile version that choices were cached for
+        self._layout   = []     # Cached [(prop name, slot name), ] for current version
+        self._slotsnum = {}     # Cached {slot name: number of slots}, as collections.Counter
+        self._ids      = {}     # Cached {artifact name: ID} for current version
+        self._names    = {}     # Cached {artifact ID: name} for current version
+        self._scrollid = None   # Cached ID of Spell Scroll for current version
+        self._combos   = set()  # Cached names of artifacts taking more than one slot
+        self._pos      = {}     # Hero byte positions adapted for savefile, as of last parse
+        self._slotmap  = {}     # Cached {artifact name: [slot, ..]} for current version
+        self._statmap  = {}     # Cached {artifact name: (attack, defense, ..)} for current version
+        self._slotmap2 = {}     # Cached {artifact name: (secondary slot, ..)} for current version
+        self._props    = None   # Cached props() result, cleared when choices are recached
+        self._slotbase = None   # Cached (state key, slots_free, slots_owner) for current state
 
 
     def props(self):
-        """Returns props for artifacts-tab, as [{type: "combo", ..}]."""
-        result = []
-        for prop in UIPROPS:
-            slot = prop.get("slot", prop["name"])
-            result.append(dict(prop, choices=[""] + self._cache.get(slot, [])))
-        return plugins.adapt(self, "props", result)
+        """Returns props for artifacts-tab, as [{type: "choice", ..}]."""
+        if self._props is None:
+            CHOICES = {slot: [""] + cc for slot, cc in self._cache.items()}  # Shared within slot
+            result = [dict(prop, choices=CHOICES.get(prop.get("slot", prop["name"]), [""]))
+                      for prop in UIPROPS]
+            self._props = plugins.adapt(self, "props", result)
+        return self._props
 
 
     def state(self):
@@ -203,22 +221,25 @@ class ArtifactsPlugin(object):
 
     def load_state(self, state):
         """Loads plugin state from given data, ignoring unknown values."""
-        state0 = type(self._state)(self._state)
+        state0 = self._state.copy()
+        cmaps = {slot: {x.lower(): x for x in self._cache[slot]}
+                 for slot in set(p.get("slot", p["name"]) for p in self.props())}
 
         for prop in self.props():  # First pass: don items
             name, slot = prop["name"], prop.get("slot", prop["name"])
             if name not in state:
                 continue  # for
-            v = state[name]
-            cmap = {x.lower(): x for x in self._cache[slot]}
+            v, cmap = state[name], cmaps[slot]
 
             if not v or hasattr(v, "lower") and v.lower() in cmap:
                 self._state[name] = v
             else:
                 logger.warning("Invalid artifact for %r: %r", name, v)
 
-        for prop in self.props():  # Second pass: validate slots and drop invalid states
-            name, slot = prop["name"], prop.get("slot", prop["name"])
+        slots_free = self._slots_base()[0]
+        for prop in self.props():  # Second pass: drop items while any slot is overfilled
+            if all(x >= 0 for x in slots_free.values()): break  # for prop
+            name = prop["name"]
             v = self._state[name]
             if not v: continue  # for prop
 
@@ -229,6 +250,7 @@ class ArtifactsPlugin(object):
                                v, "\n".join("- %s (by %s)" % (x, ", ".join(sorted(slots_owner[x])))
                                             for x in sorted(slots_full)))
                 self._state[name] = None
+                slots_free = self._slots_base()[0]
 
         result = (state0 != self._state)
         self._hero.artifacts = self._state
@@ -242,57 +264,68 @@ class ArtifactsPlugin(object):
         
         Returns whether new controls were created.
         """
-        result, version = False, self._savefile.version
+        result = False
         if self._ctrls and all(self._ctrls.values()):
-            STATS = metadata.Store.get("artifact_stats", version)
+            STATS = self._statmap
+            CHOICES = {slot: ("", ) + tuple(cc) for slot, cc in self._cache.items()}
             for prop in self.props():
                 name, slot = prop["name"], prop.get("slot", prop["name"])
-                cc = [""] + self._cache[slot]
 
-                ctrl, value, choices = self._ctrls[name], self._state.get(name), cc
-                if value and value not in choices: choices = [value] + cc
-                if choices != ctrl.GetItems(): ctrl.SetItems(choices)
-                ctrl.Value = value or ""
-                infoctrl = self._ctrls["%s-info" % name]
+                ctrl, value, choices = self._ctrls[name], self._state.get(name), CHOICES[slot]
+                if value and value not in self._cacheset[slot]: choices = (value, ) + choices
+                self._set_items(name, choices)
+                ctrl.SetStringSelection(value or "")
+                infoctrl = self._infos[name]
                 infoctrl.Label = infoctrl.ToolTip = format_stats(self, prop, self._state, STATS)
         else:
             self._ctrls, result = gui.build(self, self._panel), True
+            self._items = {p["name"]: tuple(self._ctrls[p["name"]].GetItems())
+                           for p in self.props()}
+            self._infos = {k[:-len("-info")]: v for k, v in self._ctrls.items()
+                           if k.endswith("-info")}
         self.update_slots()
         return result
 
 
     def update_slots(self):
         """Updates slots availability."""
-        version = self._savefile.version
         slots_free, slots_owner = self._slots()
-        SLOTS = metadata.Store.get("artifact_slots", version)
+        CHOICES = {slot: ("", ) + tuple(cc) for slot, cc in self._cache.items()}
         self._panel.Freeze()
         try:
             for prop in self.props():
                 name, slot = prop["name"], prop.get("slot", prop["name"])
-                cc = [""] + self._cache[slot]
+                cc = CHOICES[slot]
 
                 ctrl, value = self._ctrls[name], self._state.get(name)
 
                 if not ctrl.Enabled:
-                    if value and value not in cc:
-                        cc = [value] + cc
-                    if cc != ctrl.GetItems(): ctrl.SetItems(cc)
-                    ctrl.Value = value or ""
+                    if value and value not in self._cacheset[slot]:
+                        cc = (value, ) + cc
+                    self._set_items(name, cc)
+                    ctrl.SetStringSelection(value or "")
                     ctrl.Enable()
 
                 if not value and slot in slots_owner:
                     if slots_free.get(slot, 0):
                         slots_free[slot] -= 1
                     else:
-                        owner = next(x for x in slots_owner[slot] if len(SLOTS[x]) > 1)
+                        owner = next(v for v in (self._state.get(x) for x, _ in self._layout)
+                                     if v in slots_owner[slot] and v in self._combos)
                         l = "<taken by %s>" % owner
-                        ctrl.SetItems([l])
-                        ctrl.Value = l
+                        self._set_items(name, (l, ))
+                        ctrl.SetStringSelection(l)
                         ctrl.Disable()
         finally: self._panel.Thaw()
 
 
+    def _set_items(self, name, items):
+        """Sets items to named choice control if different from last set, as wx SetItems is slow."""
+        if self._items.get(name) == items: return
+        self._ctrls[name].SetItems(list(items))
+        self._items[name] = items
+
+
     def on_change(self, prop, row, ctrl, value):
         """
         Handler for artifact slot change, updates state,
@@ -304,15 +337,17 @@ class ArtifactsPlugin(object):
         if v2 == v1: return False
 
         # Check whether combination artifacts leave sufficient slots free
-        slots_free, slots_owner = self._slots(prop, v2)
-        slots_full = [k for k, v in slots_free.items() if v < 0]
+        slots_full = []
+        if v2 in self._combos or any(v in self._combos for v in self._state.values()):
+            slots_free, slots_owner = self._slots(prop, v2)
+            slots_full = [k for k, v in slots_free.items() if v < 0]
         if slots_full:
             wx.MessageBox("Cannot don %s, required slot taken:\n\n%s." %
                 (v2, "\n".join("- %s (by %s)" % (x, ", ".join(sorted(slots_owner[x])))
                                for x in sorted(slots_full))),
                 conf.Title, wx.OK | wx.ICON_WARNING
             )
-            ctrl.Value = v1 or ""
+            self._ctrls[prop["name"]].SetStringSelection(v1 or "")
             return False
 
         self._state[prop["name"]] = v2
@@ -321,7 +356,7 @@ class ArtifactsPlugin(object):
             evt = gui.PluginEvent(self._panel.Id, action="render", name="stats")
             wx.PostEvent(self._panel, evt)
         self.update_slots()
-        self._ctrls["%s-info" % prop["name"]].Label = format_stats(self, prop, self._state)
+        self._infos[prop["name"]].Label = format_stats(self, prop, self._state, self._statmap)
         return True
 
 
@@ -332,7 +367,7 @@ class ArtifactsPlugin(object):
         result = False
         if not all(getattr(self._hero, k, None) for k in ("stats", "basestats")): return result
 
-        STATS = metadata.Store.get("artifact_stats", self._savefile.version)
+        STATS = self._statmap
         MIN, MAX = metadata.PrimaryAttributeRange
         diff = [0] * len(metadata.PrimaryAttributes)
         for prop in self.props():
@@ -344,23 +379,41 @@ class ArtifactsPlugin(object):
         return result
 
 
-    def _slots(self, prop=None, value=None):
-        """Returns free and taken slots as {"side": 4, }, {"helm": "Skull Helmet", }."""
-        MYPROPS, SLOTS = self.props(), metadata.Store.get("artifact_slots", self._savefile.version)
+    def _slots_base(self):
+        """Returns free and taken slots for current state, cached until state changes."""
+        key = tuple(sorted(self._state.items()))
+        if self._slotbase and self._slotbase[0] == key: return self._slotbase[1:]
 
-        # Check whether combination artifacts leave sufficient slots free
-        slots_free, slots_owner = defaultdict(int), defaultdict(list)
-        for myprop in MYPROPS:
-            slots_free[myprop.get("slot", myprop["name"])] += 1
-        for prop1 in MYPROPS:
-            if prop and prop1["name"] == prop["name"]: continue # for prop
-            v = self._state.get(prop1["name"])
-            if not v: continue # for prop1
+        SLOTS = self._slotmap
+        slots_free, slots_owner = defaultdict(int, self._slotsnum), defaultdict(set)
+        for name, _ in self._layout:
+            v = self._state.get(name)
+            if not v: continue # for name
             for slot in SLOTS.get(v, ()):
                 slots_free[slot] -= 1
-                if v not in slots_owner[slot]: slots_owner[slot] += [v]
+                slots_owner[slot].add(v)
+        self._slotbase = (key, slots_free, slots_owner)
+        return slots_free, slots_owner
+
+
+    def _slots(self, prop=None, value=None):
+        """Returns free and taken slots as {"side": 4, }, {"helm": {"Skull Helmet"}, }."""
+        SLOTS = self._slotmap
+        base_free, base_owner = self._slots_base()
+
+        # Check whether combination artifacts leave sufficient slots free
+        slots_free  = defaultdict(int, base_free)
+        slots_owner = defaultdict(set, ((k, set(v)) for k, v in base_owner.items()))
+        v0 = self._state.get(prop["name"]) if prop else None
+        if v0:  # Take off current item in given slot
+            worn = any(self._state.get(x) == v0 for x, _ in self._layout if x != prop["name"])
+            for slot in SLOTS.get(v0, ()):
+                slots_free[slot] += 1
+                if worn or slot not in slots_owner: continue # for slot
+                slots_owner[slot].discard(v0)
+                if not slots_owner[slot]: slots_owner.pop(slot)
         if prop: slots_free[prop.get("slot", prop["name"])] -= 1
-        for slot in SLOTS.get(value, ())[1:]: # First element is primary slot
+        for slot in self._slotmap2.get(value, ()):
             slots_free[slot] -= 1
         return slots_free, slots_owner
 
@@ -369,44 +422,62 @@ class ArtifactsPlugin(object):
         """Returns artifacts states parsed from hero bytearrays, as [{helm, ..}, ]."""
         result = []
         version = self._savefile.version
-        slots = set(p.get("slot", p["name"]) for p in self.props()) | set(["inventory", "scroll"])
-        self._cache = {slot: sorted(metadata.Store.get("artifacts", version, category=slot))
-                       for slot in slots}
-        IDS   = metadata.Store.get("ids", version)
-        NAMES = {x[y]: y for x in [IDS] for y in self._cache["inventory"]}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        if version != self._cachever:
+            self._props = None  # Slot names depend on version-adapted props
+            slots = set(p.get("slot", p["name"]) for p in self.props())
+            slots |= set(["inventory", "scroll"])
+            self._cache = {slot: sorted(metadata.Store.get("artifacts", version, category=slot))
+                           for slot in slots}
+            self._cacheset = {slot: set(cc) for slot, cc in self._cache.items()}
+            self._cachever, self._props, self._slotbase = version, None, None
+            self._layout = [(p["name"], p.get("slot", p["name"])) for p in self.props()]
+            self._slotsnum = Counter(slot for _, slot in self._layout)
+            IDS = metadata.Store.get("ids", version)
+            self._ids      = {x: IDS[x] for x in self._cache["inventory"]}
+            self._names    = {y: x for x, y in self._ids.items()}
+            self._scrollid = IDS["Spell Scroll"]
+            SLOTS = self._slotmap = metadata.Store.get("artifact_slots", version)
+            self._statmap = metadata.Store.get("artifact_stats", version)
+            self._slotmap2 = {x: tuple(y[1:]) for x, y in SLOTS.items()} # First is primary slot
+            self._combos = set(x for x, y in self._slotmap2.items() if y)
+        NAMES = self._names
+        MYPOS = self._pos = plugins.adapt(self, "pos", POS)  # Also depends on savefile format
+        OFFSETS = [(prop["name"], MYPOS[prop["name"]]) for prop in self.props()]
+        UNPACK4, UNPACK8 = struct.Struct("<L").unpack_from, struct.Struct("<Q").unpack_from
+        BLANK, SCROLL = BLANK_ID, self._scrollid
 
         def parse_item(hero_bytes, pos):
-            b, v = hero_bytes[pos:pos + 4], util.bytoi(hero_bytes[pos:pos + 4])
-            if all(x == ord(metadata.Blank) for x in b): return None # Blank
-            return util.bytoi(hero_bytes[pos:pos + 8]) if v == IDS["Spell Scroll"] else v
+            v = UNPACK4(hero_bytes, pos)[0]
+            if v == BLANK: return None
+            return UNPACK8(hero_bytes, pos)[0] if v == SCROLL else v
 
         for hero in heroes:
             values = {}
             hero_bytes = hero.get_bytes(original=True) if original else hero.bytes
-            for prop in self.props():
-                values[prop["name"]] = NAMES.get(parse_item(hero_bytes, MYPOS[prop["name"]]))
+            for name, pos in OFFSETS:
+                values[name] = NAMES.get(parse_item(hero_bytes, pos))
             result.append(values)
         return result
 
 
-    def serialize(self):
-        """Returns new hero bytearray, with edited artifacts section."""
-        result = self._hero.bytes[:]
+    def serialize(self, out=None):
+        """
+        Returns new hero bytearray, with edited artifacts section.
+
+        @param   out  bytearray of hero bytes to write into, if not copying current hero bytes
+        """
+        result = bytearray(self._hero.bytes) if out is None else out
         bytes0 = self._hero.get_bytes(original=True)
-        version = self._savefile.version
 
-        IDS = {y: x[y] for x in [metadata.Store.get("ids", version)]
-               for y in self._cache["inventory"]}
+        IDS = self._ids
         SCROLL_ARTIFACTS = self._cache["scroll"]
-        MYPOS = plugins.adapt(self, "pos", POS)
-        SLOTS = metadata.Store.get("artifact_slots", version)
+        MYPOS = self._pos
         HAS_COMBOS = bool(MYPOS.get("reserved"))
 
         if HAS_COMBOS:
             pos_reserved, len_reserved = min(MYPOS["reserved"].values()), len(MYPOS["reserved"])
-            result[pos_reserved:pos_reserved + len_reserved] = [0] * len_reserved
-            reserved_sets = set()  # [pos updated in combination artifact flags, ]
+            result[pos_reserved:pos_reserved + len_reserved] = metadata.Null * len_reserved
+        reserved_counts = Counter()  # {pos in combination artifact flags: slots taken}
 
         state0 = self._hero.state0.get("artifacts") or {}
         for prop in self.props():
@@ -422,12 +493,13 @@ class ArtifactsPlugin(object):
             else:
                 b = metadata.Blank * 8
             result[pos:pos + len(b)] = b
-            for slot in SLOTS.get(name, [])[1:] if HAS_COMBOS else ():
-                result[MYPOS["reserved"][slot]] += 1
-                reserved_sets.add(MYPOS["reserved"][slot])
+            for slot in self._slotmap2.get(name, ()) if HAS_COMBOS else ():
+                reserved_counts[MYPOS["reserved"][slot]] += 1
 
+        for pos, count in reserved_counts.items():
+            result[pos] = count
         for pos in range(pos_reserved, pos_reserved + len_reserved) if HAS_COMBOS else ():
-            if pos not in reserved_sets and bytes0[pos] > 5:
+            if pos not in reserved_counts and bytes0[pos] > 5:
                 # Retain original bytes unchanged, Horn of the Abyss uses them for unknown purpose.
                 result[pos] = bytes0[pos]
 
@@ -7,11 +7,12 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   16.03.2020
-@modified  02.12.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import functools
 import logging
+import struct
 
 import wx
 
@@ -20,8 +21,7 @@ from h3sed import gui
 from h3sed import guibase
 from h3sed import metadata
 from h3sed import plugins
-from h3sed.lib import util
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import BLANK_ID, POS
 from h3sed.plugins.hero.artifacts import UIPROPS as ARTIFACT_PROPS
 
 
@@ -70,19 +70,31 @@ class InventoryPlugin(object):
         self._panel    = panel  # Plugin contents panel
         self._state    = []     # ["Skull Helmet", None, ..]
         self._ctrls    = []     # [wx.ComboBox, ]
+        self._cachever = None   # Savefile version that lookup tables were cached for
+        self._ids      = {}     # Cached {name: ID} for current version
+        self._names    = {}     # Cached {artifact ID: name} for current version
+        self._scrolls  = set()  # Cached names of spell scroll artifacts for current version
+        self._pos      = {}     # Hero byte positions adapted for savefile, as of last parse
+        self._cmap     = {}     # Cached {lowercase name: artifact name} for current version
+        self._slotmap  = {}     # Cached {artifact name: [slot, ..]} for current version
+        self._slotrank = {}     # Cached {slot name: index in sort order} for current version
+        self._props    = None   # Cached props() result, cleared on version change
 
 
     def props(self):
         """Returns props for inventory-tab, as [{type: "itemlist", ..}]."""
-        result = []
-        cc = sorted(metadata.Store.get("artifacts", self._savefile.version, category="inventory"))
-        for prop in UIPROPS:
-            myprop = dict(prop, item=[])
-            for item in prop["item"]:
-                myitem = dict(item, choices=cc) if "choices" in item else item
-                myprop["item"].append(myitem)
-            result.append(myprop)
-        return result
+        if self._props is None:
+            result = []
+            version = self._savefile.version
+            cc = sorted(metadata.Store.get("artifacts", version, category="inventory"))
+            for prop in UIPROPS:
+                myprop = dict(prop, item=[])
+                for item in prop["item"]:
+                    myitem = dict(item, choices=cc) if "choices" in item else item
+                    myprop["item"].append(myitem)
+                result.append(myprop)
+            self._props = result
+        return self._props
 
 
     def state(self):
@@ -105,11 +117,9 @@ class InventoryPlugin(object):
 
     def load_state(self, state):
         """Loads plugin state from given data, ignoring unknown values. Returns whether state changed."""
-        state0 = type(self._state)(self._state)
+        state0 = self._state[:]
         state = state + [None] * (self.props()[0]["max"] - len(state))
-        version = self._savefile.version
-        cmap = {x.lower(): x
-                for x in metadata.Store.get("artifacts", version, category="inventory")}
+        cmap = self._cmap
         for i, v in enumerate(state):
             if v and hasattr(v, "lower") and v.lower() in cmap:
                 self._state[i] = cmap[v.lower()]
@@ -140,21 +150,22 @@ class InventoryPlugin(object):
 
     def compact_items(self, order=(), reverse=False):
         """Compacts inventory items to top, in specified order if any."""
-        items, sortkeys = [x for x in self._state[:] if x], []
-        if order:
-            SLOTS = metadata.Store.get("artifact_slots", self._savefile.version)
-            slot_order = [x.get("slot", x["name"]) for x in ARTIFACT_PROPS]
-            slot_order += [x for x in set(sum(SLOTS.values(), [])) if x not in slot_order]
-            slot_order += ["unknown"]  # Just in case
-        for name in order:
-            if "name" == name:
-                sortkeys.append(lambda x: x.lower())
-            if "slot" == name:
-                sortkeys.append(lambda x: slot_order.index(SLOTS.get(x, slot_order[-1:])[0]))
-        if sortkeys: items.sort(key=lambda x: tuple(f(x) for f in sortkeys))
-        if reverse:  items = items[::-1]
-        items += [None] * (len(self._state) - len(items))
-        if items == self._state:
+        items, sortkeys = [x for x in self._state if x], []
+        compact = not reverse and tuple(order) in ((), ("name", )) \
+                  and all(self._state[:len(items)]) \
+                  and (not order or all(a.lower() <= b.lower() for a, b in zip(items, items[1:])))
+        if not compact:  # Skip sorting if already compact and in order
+            if order:
+                SLOTS, RANKS = self._slotmap, self._slotrank
+            for name in order:
+                if "name" == name:
+                    sortkeys.append(lambda x: x.lower())
+                if "slot" == name:
+                    sortkeys.append(lambda x: RANKS[SLOTS.get(x, ["unknown"])[0]])
+            if sortkeys: items.sort(key=lambda x: tuple(f(x) for f in sortkeys))
+            if reverse:  items = items[::-1]
+            items += [None] * (len(self._state) - len(items))
+        if compact or items == self._state:
             guibase.status("No change from compacting inventory",
                            flash=conf.StatusShortFlashLength)
             return
@@ -195,50 +206,65 @@ class InventoryPlugin(object):
     def parse(self, heroes, original=False):
         """Returns inventory states parsed from hero bytearrays, as [[item or None, ..], ]."""
         result = []
-        IDS   = metadata.Store.get("ids", self._savefile.version)
-        NAMES = {x[y]: y for x in [IDS] for y in
-                 metadata.Store.get("artifacts", self._savefile.version, category="inventory")}
-        MYPOS = plugins.adapt(self, "pos", POS)
-
-        def parse_item(hero_bytes, pos):
-            b, v = hero_bytes[pos:pos + 4], util.bytoi(hero_bytes[pos:pos + 4])
-            if all(x == metadata.Blank for x in b): return None # Blank
-            return util.bytoi(hero_bytes[pos:pos + 8]) if v == IDS["Spell Scroll"] else v
+        version = self._savefile.version
+        if version != self._cachever:
+            IDS = self._ids = metadata.Store.get("ids", version)
+            ARTIFACTS = metadata.Store.get("artifacts", version, category="inventory")
+            self._names = {IDS[x]: x for x in ARTIFACTS}
+            self._scrolls = set(metadata.Store.get("artifacts", version, category="scroll"))
+            self._cmap = {x.lower(): x for x in ARTIFACTS}
+            SLOTS = self._slotmap = metadata.Store.get("artifact_slots", version)
+            slot_order = [x.get("slot", x["name"]) for x in ARTIFACT_PROPS]
+            slot_order += [x for x in set(sum(SLOTS.values(), [])) if x not in slot_order]
+            slot_order += ["unknown"]  # Just in case
+            self._slotrank = {x: slot_order.index(x) for x in set(slot_order)}
+            self._cachever, self._props = version, None
+        self._pos = plugins.adapt(self, "pos", POS)  # Also depends on savefile format
+        NAMES, MYPOS, SCROLL = self._names, self._pos, self._ids["Spell Scroll"]
+        BLANK = BLANK_ID
+        COUNT = self.props()[0]["max"]
+        UNPACK = struct.Struct("<%sL" % (2 * COUNT)).unpack_from  # Slot as item ID + scroll spell ID
 
         for hero in heroes:
             values = []
             hero_bytes = hero.get_bytes(original=True) if original else hero.bytes
-            for prop in self.props():
-                for i in range(prop["max"]):
-                    v = parse_item(hero_bytes, MYPOS["inventory"] + i*8)
-                    values.append(NAMES.get(v))
+            ids = UNPACK(hero_bytes, MYPOS["inventory"])
+            for v, v2 in zip(ids[::2], ids[1::2]):
+                if v == BLANK: values.append(None)
+                else: values.append(NAMES.get((v2 << 32) + v if v == SCROLL else v))
             result.append(values)
         return result
 
 
-    def serialize(self):
-        """Returns new hero bytearray, with edited inventory section."""
-        result = self._hero.bytes[:]
-        bytes0 = self._hero.get_bytes(original=True)
+    def serialize(self, out=None):
+        """
+        Returns new hero bytearray, with edited inventory section.
+
+        @param   out  bytearray of hero bytes to write into, if not copying current hero bytes
+        """
+        result = bytearray(self._hero.bytes) if out is None else out
 
-        IDS = metadata.Store.get("ids", self._savefile.version)
-        SCROLL_ARTIFACTS = metadata.Store.get("artifacts", self._savefile.version, category="scroll")
-        MYPOS = plugins.adapt(self, "pos", POS)
+        IDS, SCROLL_ARTIFACTS, MYPOS = self._ids, self._scrolls, self._pos
+        BLANK = BLANK_ID
         pos = MYPOS["inventory"]
+        STRUCT = struct.Struct("<%sL" % (2 * len(self._state)))  # Slot as item ID + scroll spell ID
 
         state0 = self._hero.state0.get("inventory") or []
         for prop in self.props():
-            for i, name in enumerate(self._state) if "itemlist" == prop["type"] else ():
+            if "itemlist" != prop["type"]: continue # for prop
+            ids0, ids = None, []  # Original slot values, read only if needed
+            for i, name in enumerate(self._state):
                 v = IDS.get(name)
                 if name in SCROLL_ARTIFACTS:
-                    b = util.itoby(v, 8)
+                    ids += [v & 0xFFFFFFFF, v >> 32]
                 elif v:
-                    b = util.itoby(v, 4) + metadata.Blank * 4
+                    ids += [v, BLANK]
                 elif i < len(state0) and not state0[i]:
                     # Retain original bytes unchanged, as game uses both 0x00 and 0xFF
-                    b = bytes0[pos + i * 8:pos + (i + 1) * 8]
+                    if ids0 is None: ids0 = STRUCT.unpack_from(self._hero.get_bytes(original=True), pos)
+                    ids += ids0[i * 2:i * 2 + 2]
                 else:
-                    b = metadata.Blank * 4 + metadata.Null * 4
-                result[pos + i * len(b):pos + (i + 1) * len(b)] = b
+                    ids += [BLANK, 0]
+            STRUCT.pack_into(result, pos, *ids)
 
         return result
@@ -7,10 +7,11 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   14.03.2020
-@modified  02.12.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import logging
+import operator
 
 import wx
 
@@ -71,23 +72,35 @@ class SkillsPlugin(object):
         self._hero     = None
         self._panel    = panel  # Plugin contents panel
         self._state    = []     # [{"name": "Estates", "level": "Basic"}, {..}]
+        self._cachever = None   # Savefile version that lookup tables were cached for
+        self._ids      = {}     # Cached {skill name: skill index} for current version
+        self._names    = []     # Cached skill names by skill index for current version
+        self._levels   = {}     # Cached {level name: level value} for current version
+        self._lnames   = {}     # Cached {level value: level name} for current version
+        self._smap     = {}     # Cached {lowercase name: skill name} for current version
+        self._lmap     = {}     # Cached {lowercase name: level name} for current version
+        self._pos      = {}     # Hero byte positions adapted for savefile, as of last parse
+        self._props    = None   # Cached props() result, cleared on version change
+        self._serial   = (None, None)  # Last serialized ((name, level), ..) and section bytes
 
 
     def props(self):
         """Returns props for skills-tab, as {type: "itemlist", ..}."""
-        result = []
-        version = self._savefile.version
-        ss = sorted(metadata.Store.get("skills", version))
-        ll = metadata.Store.get("skill_levels", version)
-        for prop in UIPROPS:
-            myprop = dict(prop)
-            if "itemlist" == prop["type"]:
-                myprop.update(item=[], choices=ss)
-                for item in prop["item"]:
-                    myitem = dict(item, choices=ll) if "choices" in item else item
-                    myprop["item"].append(myitem)
-            result.append(myprop)
-        return plugins.adapt(self, "props", result)
+        if self._props is None:
+            result = []
+            version = self._savefile.version
+            ss = sorted(metadata.Store.get("skills", version))
+            ll = metadata.Store.get("skill_levels", version)
+            for prop in UIPROPS:
+                myprop = dict(prop)
+                if "itemlist" == prop["type"]:
+                    myprop.update(item=[], choices=ss)
+                    for item in prop["item"]:
+                        myitem = dict(item, choices=ll) if "choices" in item else item
+                        myprop["item"].append(myitem)
+                result.append(myprop)
+            self._props = plugins.adapt(self, "props", result)
+        return self._props
 
 
     def state(self):
@@ -110,19 +123,18 @@ class SkillsPlugin(object):
 
     def load_state(self, state):
         """Loads plugin state from given data, ignoring unknown values. Returns whether state changed."""
-        state0 = type(self._state)(self._state)
+        state0 = self._state[:]
         state = state[:self.props()[0]["max"]]
-        version = self._savefile.version
-        smap = {x.lower(): x for x in metadata.Store.get("skills", version)}
-        lmap = {x.lower(): x for x in metadata.Store.get("skill_levels", version)}
+        smap, lmap = self._smap, self._lmap
         self._state = type(self._state)()
         for i, v in enumerate(state):
             if not isinstance(v, dict):
                 logger.warning("Invalid data type in skill #%s: %r", i + 1, v)
                 continue  # for
             name, level = v.get("name"), v.get("level")
-            if name and name.lower() in smap and level and level.lower() in lmap:
-                self._state += [{"name": smap[name.lower()], "level": lmap[level.lower()]}]
+            name, level = name and smap.get(name.lower()), level and lmap.get(level.lower())
+            if name and level:
+                self._state.append({"name": name, "level": level})
             else:
                 logger.warning("Invalid skill #%s: %r", i + 1, v)
         return state0 != self._state
@@ -151,49 +163,60 @@ class SkillsPlugin(object):
         """Returns skills states parsed from hero bytearrays, as [{name, level, slot}]."""
         result = []
         version = self._savefile.version
-        IDS = {y: x[y] for x in [metadata.Store.get("ids", version)]
-               for y in metadata.Store.get("skills", version)}
-        LEVELNAMES = {x[y]: y for x in [metadata.Store.get("ids", version)]
-                      for y in metadata.Store.get("skill_levels", version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        if version != self._cachever:
+            ALLIDS = metadata.Store.get("ids", version)
+            SKILLS = metadata.Store.get("skills", version)
+            self._ids    = {x: ALLIDS[x] for x in SKILLS}
+            self._levels = {x: ALLIDS[x] for x in metadata.Store.get("skill_levels", version)}
+            self._lnames = {y: x for x, y in self._levels.items()}
+            self._names  = [None] * (max(self._ids.values()) + 1)
+            for name, pos in self._ids.items(): self._names[pos] = name
+            self._smap   = {x.lower(): x for x in SKILLS}
+            self._lmap   = {x.lower(): x for x in self._levels}
+            self._serial = (None, None)  # Section length and IDs are per version
+            self._cachever, self._props = version, None
+        self._pos = plugins.adapt(self, "pos", POS)  # Also depends on savefile format
+        NAMES, LEVELNAMES, MYPOS = self._names, self._lnames, self._pos
+        POS0, POS1, POS2 = MYPOS["skills_count"], MYPOS["skills_level"], MYPOS["skills_slot"]
+        LEN, SLOTKEY = len(NAMES), operator.itemgetter(0)
 
         for hero in heroes:
             values = []
             hero_bytes = hero.get_bytes(original=True) if original else hero.bytes
-            count = hero_bytes[MYPOS["skills_count"]]
-            for name in metadata.Store.get("skills", version):
-                pos = IDS.get(name)
-                level, slot = (hero_bytes[MYPOS[k] + pos] for k in ("skills_level", "skills_slot"))
-                if not level or not slot or slot > count:
-                    continue # for i
-                values.append({"name": name, "level": LEVELNAMES[level], "slot": slot})
-            result.append(sorted(values, key=lambda x: x.pop("slot")))
+            count = hero_bytes[POS0]
+            levels, slots = hero_bytes[POS1:POS1 + LEN], hero_bytes[POS2:POS2 + LEN]
+            for name, level, slot in zip(NAMES, levels, slots) if count else ():  # None if count 0
+                if not name or not level or not slot or slot > count:
+                    continue # for name, level, slot
+                values.append((slot, name, level))
+            values.sort(key=SLOTKEY)
+            result.append([{"name": name, "level": LEVELNAMES[level]} for _, name, level in values])
         return result
 
 
-    def serialize(self):
-        """Returns new hero bytearray, with edited skills sections."""
-        result = self._hero.bytes[:]
-        version = self._savefile.version
-        IDS    = {y: x[y] for x in [metadata.Store.get("ids", version)]
-                  for y in metadata.Store.get("skills", version)}
-        LEVELS = {y: x[y] for x in [metadata.Store.get("ids", version)]
-                  for y in metadata.Store.get("skill_levels", version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
-
-        levels, count = bytearray(len(IDS)), 0
-        slots         = bytearray(len(IDS))
-        for slot, skill in enumerate(self._state, 1):
-            name, level = skill["name"], skill["level"]
-            pos = IDS.get(name)
-            if pos is None:
-                logger.warning("Unknown skill at slot #%s: %s.", slot + 1, name)
-                continue # for slot, skill
-            count += 1
-            levels[pos] = LEVELS[level]
-            slots[pos] = slot
-        result[MYPOS["skills_level"]:MYPOS["skills_level"] + len(IDS)] = levels
-        result[MYPOS["skills_slot"] :MYPOS["skills_slot"]  + len(IDS)] = slots
+    def serialize(self, out=None):
+        """
+        Returns new hero bytearray, with edited skills sections.
+
+        @param   out  bytearray of hero bytes to write into, if not copying current hero bytes
+        """
+        result = bytearray(self._hero.bytes) if out is None else out
+        IDS, LEVELS, MYPOS = self._ids, self._levels, self._pos
+        POS1, POS2, LEN = MYPOS["skills_level"], MYPOS["skills_slot"], len(IDS)
+
+        pairs = tuple(map(operator.itemgetter("name", "level"), self._state))
+        if pairs == self._serial[0]: levels, slots, count = self._serial[1]
+        else:
+            levels, slots, count = bytearray(LEN), bytearray(LEN), 0
+            for slot, (name, level) in enumerate(pairs, 1):
+                pos = IDS.get(name)
+                if pos is None:
+                    logger.warning("Unknown skill at slot #%s: %s.", slot + 1, name)
+                    continue # for slot, (name, level)
+                count += 1
+                levels[pos], slots[pos] = LEVELS[level], slot
+            self._serial = (pairs, (levels, slots, count))
+        result[POS1:POS1 + LEN], result[POS2:POS2 + LEN] = levels, slots
         result[MYPOS["skills_count"]] = count
 
         return result
@@ -7,9 +7,11 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   20.03.2020
-@modified  02.12.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
+import bisect
+import itertools
 import logging
 
 from h3sed import gui
@@ -53,15 +55,25 @@ class SpellsPlugin(object):
         self._hero     = None
         self._panel    = panel  # Plugin contents panel
         self._state    = []     # ["Haste", "Slow", ..]
+        self._cachever = None   # Savefile version that lookup tables were cached for
+        self._ids      = {}     # Cached {spell name: spell index} for current version
+        self._names    = []     # Cached spell names by spell index for current version
+        self._cmap     = {}     # Cached {lowercase name: spell name} for current version
+        self._len      = 0      # Cached length of spell byte sections for current version
+        self._gaps     = []     # Cached indexes in spell byte sections not used by any spell
+        self._artimap  = {}     # Cached {artifact name: [spell name, ]} for current version
+        self._bannable = set()  # Cached names of spells that maps can ban, for current version
+        self._pos      = {}     # Hero byte positions adapted for savefile, as of last parse
+        self._props    = None   # Cached props() result, cleared on version change
+        self._artispells = (None, set(), set())  # Last (artifacts, artifact spells, bannable ones)
 
 
     def props(self):
         """Returns props for spells-tab, as [{type: "checklist", ..}]."""
-        result = []
-        for prop in UIPROPS:
-            cc = metadata.Store.get("spells", self._savefile.version)
-            result.append(dict(prop, choices=sorted(cc)))
-        return result
+        if self._props is None:
+            cc = sorted(metadata.Store.get("spells", self._savefile.version))
+            self._props = [dict(prop, choices=cc) for prop in UIPROPS]
+        return self._props
 
 
     def state(self):
@@ -84,12 +96,13 @@ class SpellsPlugin(object):
 
     def load_state(self, state):
         """Loads plugin state from given data, ignoring unknown values. Returns whether state changed."""
-        state0 = type(self._state)(self._state)
+        state0 = self._state[:]
         self._state = []
-        cmap = {x.lower(): x for x in metadata.Store.get("spells", self._savefile.version)}
+        cmap = self._cmap
         for i, v in enumerate(state):
-            if v and hasattr(v, "lower") and v.lower() in cmap:
-                self._state += [cmap[v.lower()]]
+            name = cmap.get(v.lower()) if v and hasattr(v, "lower") else None
+            if name:
+                self._state.append(name)
             elif v:
                 logger.warning("Invalid spell #%s: %s", i + 1, v)
         self._state.sort()
@@ -100,64 +113,91 @@ class SpellsPlugin(object):
         """Creates controls from state, disabling all if no spellbook. Returns True."""
         gui.build(self, self._panel)
         if not util.get(self._hero, "stats", "spellbook"):
-            for c in self._panel.Children: c.Disable()
+            self._panel.Freeze()
+            try:
+                for c in self._panel.Children: c.Disable()
+            finally:
+                self._panel.Thaw()
         return True
 
 
     def on_add(self, prop, value):
         """Adds spell to current hero spells, returns whether state changed."""
-        if value in self._state: return False
-        self._state.append(value)
-        self._state.sort()
+        index = bisect.bisect_left(self._state, value)  # State is kept sorted
+        if value in self._state[index:index + 1]: return False
+        self._state.insert(index, value)
         return True
 
 
     def parse(self, heroes, original=False):
         """Returns spells states parsed from hero bytearrays, as [[name, ], ]."""
         result = [] # Lists of values like ["Haste", ..]
-        IDS = {y: x[y] for x in [metadata.Store.get("ids", self._savefile.version)]
-               for y in metadata.Store.get("spells", self._savefile.version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        version = self._savefile.version
+        if version != self._cachever:
+            ALLIDS = metadata.Store.get("ids", version)
+            SPELLS = metadata.Store.get("spells", version)
+            self._ids  = {x: ALLIDS[x] for x in SPELLS}
+            self._cmap = {x.lower(): x for x in SPELLS}
+            self._len  = max(self._ids.values()) + 1
+            self._gaps = sorted(set(range(self._len)) - set(self._ids.values()))
+            self._names = [None] * self._len
+            for name, pos in self._ids.items(): self._names[pos] = name
+            self._artimap  = metadata.Store.get("artifact_spells", version)
+            self._bannable = set(metadata.Store.get("bannable_spells", version))
+            self._artispells = (None, set(), set())  # Artifact spells are per version
+            self._cachever, self._props = version, None
+        self._pos = plugins.adapt(self, "pos", POS)  # Also depends on savefile format
+        NAMES, POS1, LEN = self._names, self._pos["spells_book"], self._len
 
         for hero in heroes:
-            values = []
             hero_bytes = hero.get_bytes(original=True) if original else hero.bytes
-            for name, pos in IDS.items():
-                if hero_bytes[MYPOS["spells_book"] + pos]: values.append(name)
+            book = hero_bytes[POS1:POS1 + LEN]
+            if not any(book):  # No spells in book
+                result.append([])
+                continue # for hero
+            values = list(filter(None, itertools.compress(NAMES, book)))  # Names at set bytes
             result.append(sorted(values))
         return result
 
 
-    def serialize(self):
-        """Returns new hero bytearray, with edited spells sections."""
-        result = self._hero.bytes[:]
-        version = self._savefile.version
+    def serialize(self, out=None):
+        """
+        Returns new hero bytearray, with edited spells sections.
 
-        IDS = {y: x[y] for x in [metadata.Store.get("ids", version)]
-               for y in metadata.Store.get("spells", version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
-        state = self._state
+        @param   out  bytearray of hero bytes to write into, if not copying current hero bytes
+        """
+        result = bytearray(self._hero.bytes) if out is None else out
+        IDS, MYPOS = self._ids, self._pos
+        POS1, POS2, LEN = MYPOS["spells_book"], MYPOS["spells_available"], self._len
 
         artispells, condspells = set(), set()
         if getattr(self._hero, "artifacts", None):
-            SPELL_ARTIFACTS = metadata.Store.get("artifact_spells", version)
-            artispells0 = set(y for x in self._hero.state0.get("artifacts", {}).values()
-                              for y in SPELL_ARTIFACTS.get(x, []))
-            artispells  = set(y for x in self._hero.artifacts.values()
-                              for y in SPELL_ARTIFACTS.get(x, []))
-            condspells  = set(metadata.Store.get("bannable_spells", version))
-            condspells &= artispells0 & artispells
-        for name, pos in IDS.items():
-            in_book   = name in state
-            available = in_book or name in artispells
+            items0 = tuple(self._hero.state0.get("artifacts", {}).values())
+            items  = tuple(self._hero.artifacts.values())
+            if (items0, items) == self._artispells[0]:
+                artispells, condspells = self._artispells[1:]
+            else:
+                SPELL_ARTIFACTS = self._artimap
+                artispells0 = set().union(*(SPELL_ARTIFACTS.get(x, ()) for x in items0))
+                artispells  = set().union(*(SPELL_ARTIFACTS.get(x, ()) for x in items))
+                condspells  = self._bannable & artispells0 & artispells
+                self._artispells = ((items0, items), artispells, condspells)
+        book, available = bytearray(LEN), bytearray(LEN)
+        for pos in self._gaps:  # Retain unused bytes unchanged
+            book[pos], available[pos] = result[POS1 + pos], result[POS2 + pos]
+        for name in self._state:
+            pos = IDS.get(name)
+            if pos is not None: book[pos] = available[pos] = 1
+        for name in artispells:
+            pos = IDS.get(name)
+            if pos is None or book[pos]: continue # for name
 
             # Some maps may have certain spells banned, e.g. Summon Boat on maps with no water
             # in Horn of the Abyss; savefiles will not have these spell bits set.
             # At least try to avoid a needless file change if we can detect the ban being in effect.
-            if available and not in_book and not result[MYPOS["spells_available"] + pos] \
-            and name in condspells: available = False
+            if not result[POS2 + pos] and name in condspells: continue # for name
 
-            result[MYPOS["spells_book"] + pos]      = in_book
-            result[MYPOS["spells_available"] + pos] = available
+            available[pos] = 1
+        result[POS1:POS1 + LEN], result[POS2:POS2 + LEN] = book, available
 
         return result
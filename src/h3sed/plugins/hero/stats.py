@@ -9,7 +9,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   16.03.2020
-@modified  02.12.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import functools
@@ -24,7 +24,7 @@ from h3sed import guibase
 from h3sed import metadata
 from h3sed import plugins
 from h3sed.lib import util
-from h3sed.plugins.hero import POS
+from h3sed.plugins.hero import BLANK_ID, POS
 from h3sed.plugins.hero.artifacts import UIPROPS as ARTIFACT_PROPS
 
 
@@ -162,20 +162,28 @@ class StatsPlugin(object):
         self._hero     = None
         self._panel    = panel  # Plugin contents panel
         self._state    = {}     # {attack, defense, ..}
+        self._cachever = None   # Savefile version that lookup tables were cached for
+        self._ids      = {}     # Cached {name: ID} for current version
+        self._names    = {}     # Cached {special artifact ID: name} for current version
+        self._pos      = {}     # Hero byte positions adapted for savefile, as of last parse
+        self._props    = None   # Cached props() result, cleared on version change
+        self._plan     = []     # Cached value layout, as [(name, type, position, struct, ?value)]
 
 
     def props(self):
         """Returns props for stats-tab, as [{type: "number", ..}]."""
-        result = []
-        IDS = metadata.Store.get("ids", self._savefile.version)
-        for prop in UIPROPS:
-            if "value" in prop: prop = dict(prop, value=IDS[prop["label"]])
-            if prop["name"] in metadata.PrimaryAttributes and prop.get("info", prop) is None:
-                prop = dict(prop, info=self.format_stat_bonus)
-            if prop["name"] in ("exp", "level") and "extra" in prop:
-                prop = dict(prop, extra=dict(prop["extra"], handler=self.on_experience_level))
-            result.append(prop)
-        return plugins.adapt(self, "props", result)
+        if self._props is None:
+            result, version = [], self._savefile.version
+            IDS = self._ids if version == self._cachever else metadata.Store.get("ids", version)
+            for prop in UIPROPS:
+                if "value" in prop: prop = dict(prop, value=IDS[prop["label"]])
+                if prop["name"] in metadata.PrimaryAttributes and prop.get("info", prop) is None:
+                    prop = dict(prop, info=self.format_stat_bonus)
+                if prop["name"] in ("exp", "level") and "extra" in prop:
+                    prop = dict(prop, extra=dict(prop["extra"], handler=self.on_experience_level))
+                result.append(prop)
+            self._props = plugins.adapt(self, "props", result)
+        return self._props
 
 
     def state(self):
@@ -202,7 +210,7 @@ class StatsPlugin(object):
 
     def load_state(self, state):
         """Loads plugin state from given data, ignoring unknown values. Returns whether state changed."""
-        state0 = type(self._state)(self._state)
+        state0 = self._state.copy()
         for prop in self.props():
             if prop["name"] not in state:
                 continue  # for
@@ -298,52 +306,58 @@ class StatsPlugin(object):
     def parse(self, heroes, original=False):
         """Returns stats states parsed from hero bytearrays, as [{attack, defense, ..}, ]."""
         result = []
-        NAMES = {x[y]: y for x in [metadata.Store.get("ids", self._savefile.version)]
-                 for y in metadata.Store.get("special_artifacts", self._savefile.version)}
-        MYPOS = plugins.adapt(self, "pos", POS)
+        version = self._savefile.version
+        if version != self._cachever:
+            IDS = self._ids = metadata.Store.get("ids", version)
+            self._names = {IDS[x]: x for x in metadata.Store.get("special_artifacts", version)}
+            self._cachever, self._props, self._plan = version, None, []
+        MYPOS = plugins.adapt(self, "pos", POS)  # Also depends on savefile format
+        if not self._plan or MYPOS != self._pos:
+            self._plan = [(x["name"], x["type"], MYPOS[x["name"]],
+                           util.INT_STRUCTS[x.get("len", 4)], x.get("value")) for x in self.props()]
+        self._pos = MYPOS
+        NAMES, PLAN, BLANK = self._names, self._plan, BLANK_ID
+        UNPACK4 = util.INT_STRUCTS[4].unpack_from
 
         def parse_special(hero_bytes, pos):
-            b, v = hero_bytes[pos:pos + 4], util.bytoi(hero_bytes[pos:pos + 4])
-            return None if all(x == ord(metadata.Blank) for x in b) else v
+            v = UNPACK4(hero_bytes, pos)[0]
+            return None if v == BLANK else v
 
         for hero in heroes:
             values = {}
             hero_bytes = hero.get_bytes(original=True) if original else hero.bytes
-            for prop in self.props():
-                pos = MYPOS[prop["name"]]
-                if "check" == prop["type"]:
+            for name, ptype, pos, fmt, _ in PLAN:
+                if "check" == ptype:
                     v = parse_special(hero_bytes, pos) is not None
-                elif "number" == prop["type"]:
-                    v = util.bytoi(hero_bytes[pos:pos + prop["len"]])
-                elif "combo" == prop["type"]:
+                elif "number" == ptype:
+                    v = fmt.unpack_from(hero_bytes, pos)[0]
+                elif "combo" == ptype:
                     v = NAMES.get(parse_special(hero_bytes, pos), "")
-                values[prop["name"]] = v
+                values[name] = v
             result.append(values)
         return result
 
 
-    def serialize(self):
-        """Returns new hero bytearray, with edited stats sections."""
-        result = self._hero.bytes[:]
+    def serialize(self, out=None):
+        """
+        Returns new hero bytearray, with edited stats sections.
 
-        IDS = metadata.Store.get("ids", self._savefile.version)
-        MYPOS = plugins.adapt(self, "pos", POS)
+        @param   out  bytearray of hero bytes to write into, if not copying current hero bytes
+        """
+        result = bytearray(self._hero.bytes) if out is None else out
 
-        for prop in self.props():
-            v, pos = self._state[prop["name"]], MYPOS[prop["name"]]
-            if "check" == prop["type"]:
-                b = (util.itoby(prop["value"], 4) if v else metadata.Blank * 4)
-                b = b[:4] + result[pos + 4:pos + 8]
-            elif "number" == prop["type"]: b = util.itoby(v, prop["len"])
-            elif "combo" == prop["type"]:
+        IDS, PLAN, BLANK = self._ids, self._plan, BLANK_ID
+
+        for name, ptype, pos, fmt, value in PLAN:
+            v = self._state[name]
+            if "check" == ptype: v = value if v else BLANK
+            elif "combo" == ptype:
                 if v:
                     v = IDS.get(v)
                     if v is None:
-                        logger.warning("Unknown stats %s value: %s.", prop["name"],
-                                       self._state[prop["name"]])
-                        continue # for prop
-                    b = util.itoby(v, 4)[:4] + result[pos + 4:pos + 8]
-                else: b = metadata.Blank * 4
-            result[pos:pos + len(b)] = b
+                        logger.warning("Unknown stats %s value: %s.", name, self._state[name])
+                        continue # for name, ptype, ..
+                else: v = BLANK
+            fmt.pack_into(result, pos, v)
 
         return result
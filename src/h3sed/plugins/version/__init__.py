@@ -34,7 +34,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   22.03.2020
-@modified  22.05.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import copy
@@ -57,13 +57,16 @@ logger = logging.getLogger(__package__)
 
 
 PLUGINS = [] # Loaded plugins as [{name, module}, ]
+ADAPTERS = [] # adapt() functions of loaded plugins, in plugin order
 
 
 def init():
     """Loads hero plugins list."""
-    global PLUGINS
+    global ADAPTERS, PLUGINS
     basefile = os.path.join(conf.PluginDirectory, "version", "__init__.py")
     PLUGINS[:] = plugins.load_modules(__package__, basefile)
+    ADAPTERS[:] = [p["module"].adapt for p in PLUGINS
+                   if callable(getattr(p["module"], "adapt", None))]
 
 
 def adapt(source, category, value):
@@ -73,7 +76,6 @@ def adapt(source, category, value):
     @param   source    source plugin or subplugin
     @param   category  value category like "props"
     """
-    for p in PLUGINS:
-        if callable(getattr(p["module"], "adapt", None)):
-            value = p["module"].adapt(source, category, value)
+    for adapter in ADAPTERS:
+        value = adapter(source, category, value)
     return value
@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   13.09.2024
-@modified  14.09.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import re
@@ -19,6 +19,9 @@ PROPS = {"name": "hc", "label": "Heroes Chronicles", "index": 4}
 
 SAVEFILE_MAGIC = b"HCHRONSVG"
 
+## Adapted regexes, as {(category, pattern, flags): compiled regex}
+REGEX_CACHE = {}
+
 
 def props():
     """Returns props as {label, index}."""
@@ -33,16 +36,23 @@ def adapt(source, category, value):
     - "savefile_header_regex": adds support for Chronicles savefiles
     """
     result = value
+    if category not in ("savefile_magic_regex", "savefile_header_regex"):
+        return result
+    if not hasattr(value, "pattern") or SAVEFILE_MAGIC in value.pattern:
+        return result
+
+    key = (category, value.pattern, value.flags)
+    if key in REGEX_CACHE:
+        return REGEX_CACHE[key]
     if "savefile_magic_regex" == category:
-        if hasattr(value, "pattern") and SAVEFILE_MAGIC not in value.pattern:
-            result = re.compile(value.pattern + b"|^%s" % SAVEFILE_MAGIC)
+        result = re.compile(value.pattern + b"|^%s" % SAVEFILE_MAGIC)
     elif "savefile_header_regex" == category:
-        if hasattr(value, "pattern") and SAVEFILE_MAGIC not in value.pattern:
-            DEFAULT_MAGIC = Savefile.RGX_MAGIC.pattern.replace(b"^", b"")
-            if DEFAULT_MAGIC in value.pattern:
-                repl = b"(%s|%s)" % (DEFAULT_MAGIC, SAVEFILE_MAGIC)
-                pattern = value.pattern.replace(DEFAULT_MAGIC, repl, 1)
-                result = re.compile(pattern, value.flags)
+        DEFAULT_MAGIC = Savefile.RGX_MAGIC.pattern.replace(b"^", b"")
+        if DEFAULT_MAGIC in value.pattern:
+            repl = b"(%s|%s)" % (DEFAULT_MAGIC, SAVEFILE_MAGIC)
+            pattern = value.pattern.replace(DEFAULT_MAGIC, repl, 1)
+            result = re.compile(pattern, value.flags)
+    REGEX_CACHE[key] = result
     return result
 
 
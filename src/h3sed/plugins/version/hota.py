@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   22.03.2020
-@modified  14.09.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import re
@@ -357,11 +357,11 @@ RGX_HERO = re.compile(b"""
                              # Artifacts:     XY 00 00 00 FF FF FF FF
                              # Scrolls:       XY 00 00 00 00 00 00 00
     (?P<artifacts>           # Catapult etc:  XY 00 00 00 XY XY 00 00
-      (\xFF{4} .{4}) | (.\x00{3} (\x00{4} | \xFF{4})) | (.\x00{3}.{2}\x00{2})
+      \xFF{4} .{4} | .\x00{3} (?: \xFF{4} | .{2}\x00{2})
     ){19}
 
                              # 512 bytes: 64 8-byte artifacts in backpack      503-1014
-    ( ((.\x00{3}) | \xFF{4}){2} ){64}
+    (?: (?: .\x00{3} | \xFF{4} ){2} ){64}
 
                              # 10 bytes: slots taken by combination artifacts 1015-1024
                              # Values should only be [\x00-\x05] as the count reserved,
@@ -377,9 +377,10 @@ def init():
     """Initializes artifacts and creatures for Horn of the Abyss."""
     Store.add("artifacts", Artifacts, version=PROPS["name"])
     Store.add("artifacts", Artifacts, version=PROPS["name"], category="inventory")
-    for slot in set(sum(ArtifactSlots.values(), [])):
-        Store.add("artifacts", [k for k, v in ArtifactSlots.items() if v[0] == slot],
-                  version=PROPS["name"], category=slot)
+    slotartifacts = {x: [] for slots in ArtifactSlots.values() for x in slots}
+    for name, slots in ArtifactSlots.items(): slotartifacts[slots[0]].append(name)
+    for slot, names in slotartifacts.items():
+        Store.add("artifacts", names, version=PROPS["name"], category=slot)
 
     Store.add("artifact_slots",    ArtifactSlots,    version=PROPS["name"])
     Store.add("artifact_spells",   ArtifactSpells,   version=PROPS["name"])
@@ -410,9 +411,10 @@ def adapt(source, category, value):
     """
     root = util.get(source, "parent", default=source)
     if util.get(root, "savefile", "version") != PROPS["name"]: return value
+    name = util.get(source, "name")
 
     result = value
-    if "props" == category and "stats" == util.get(source, "name"):
+    if "props" == category and "stats" == name:
         # Replace ballista-prop checkbox with combobox including cannon
         result = []
         for prop in value:
@@ -422,14 +424,14 @@ def adapt(source, category, value):
             elif "level" == prop["name"]:
                 prop = dict(prop, max=HeroLevelMax)
             result.append(prop)
-    if "experience_levels" == category and "stats" == util.get(source, "name"):
+    if "experience_levels" == category and "stats" == name:
         result = {k: v for k, v in value.items() if k <= HeroLevelMax}
-    elif "props" == category and "skills" == util.get(source, "name"):
+    elif "props" == category and "skills" == name:
         result = []
         for prop in value:
             if "max" in prop: prop = dict(prop, max=prop["max"] + len(Skills))
             result.append(prop)
-    elif "regex" == category and "hero" == util.get(source, "name"):
+    elif "regex" == category and "hero" == name:
         # Replace hero regex with one expecting 29 skill choices
         result = RGX_HERO
     elif "pos" == category and "hero" == util.get(root, "name"):
@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   22.05.2024
-@modified  14.09.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 import re
@@ -61,12 +61,12 @@ RGX_HERO = re.compile(b"""
                              # Blank spots:   FF FF FF FF XY XY XY XY
                              # Artifacts:     XY 00 00 00 FF FF FF FF
                              # Scrolls:       XY 00 00 00 00 00 00 00
-    (?P<artifacts>(          # Catapult etc:  XY 00 00 00 XY XY 00 00
-      (\xFF{4} .{4}) | (.\x00{3} (\x00{4} | \xFF{4})) | (.\x00{3}.{2}\x00{2})
+    (?P<artifacts>(?:        # Catapult etc:  XY 00 00 00 XY XY 00 00
+      \xFF{4} .{4} | .\x00{3} (?: \xFF{4} | .{2}\x00{2})
     ){18})
 
                              # 512 bytes: 64 8-byte artifacts in backpack      495-1006
-    ( ((.\x00{3}) | \xFF{4}){2} ){64}
+    (?: (?: .\x00{3} | \xFF{4} ){2} ){64}
 """, re.VERBOSE | re.DOTALL)
 
 
@@ -97,13 +97,13 @@ RGX_HERO_NEWFORMAT = re.compile(b"""
                              # Blank spots:   FF FF FF FF XY XY XY XY
                              # Artifacts:     XY 00 00 00 FF FF FF FF
                              # Scrolls:       XY 00 00 00 00 00 00 00
-    (?P<artifacts>(          # Catapult etc:  XY 00 00 00 XY XY 00 00
-      (\xFF{4} .{4}) | (.\x00{3} (\x00{4} | \xFF{4})) | (.\x00{3}.{2}\x00{2})
+    (?P<artifacts>(?:        # Catapult etc:  XY 00 00 00 XY XY 00 00
+      \xFF{4} .{4} | .\x00{3} (?: \xFF{4} | .{2}\x00{2})
     ){18})
     .{8}                     # 8 bytes: side5 slot unused in RoE               494-502
 
                              # 512 bytes: 64 8-byte artifacts in backpack      503-1014
-    ( ((.\x00{3}) | \xFF{4}){2} ){64}
+    (?: (?: .\x00{3} | \xFF{4} ){2} ){64}
 """, re.VERBOSE | re.DOTALL)
 
 
@@ -124,16 +124,18 @@ def adapt(source, category, value):
     root = util.get(source, "parent", default=source)
     savefile = getattr(root, "savefile", None)
     if not savefile or savefile.version != PROPS["name"]: return value
-    is_new_format = savefile.match_byte_ranges(BytePositions, NewVersionByteRanges)
+    name = util.get(source, "name")
 
     result = value
-    if "props" == category and "artifacts" == util.get(source, "name"):
+    if "props" == category and "artifacts" == name:
         result = [x for x in value if x.get("name") != "side5"]
-    elif "regex" == category and "hero" == util.get(source, "name"):
+    elif "regex" == category and "hero" == name:
         # Replace hero regex with one expecting 18 artifact slots
+        is_new_format = savefile.match_byte_ranges(BytePositions, NewVersionByteRanges)
         result = RGX_HERO_NEWFORMAT if is_new_format else RGX_HERO
     elif "pos" == category and "hero" == util.get(root, "name"):
         # Move inventory start to side5 position, drop side5 unless new format
+        is_new_format = savefile.match_byte_ranges(BytePositions, NewVersionByteRanges)
         result = value.copy()
         if is_new_format: result.pop("side5")
         else: result["inventory"] = result.pop("side5")
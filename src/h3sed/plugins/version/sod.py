@@ -7,7 +7,7 @@ This file is part of h3sed - Heroes3 Savegame Editor.
 Released under the MIT License.
 
 @created   22.03.2020
-@modified  14.09.2024
+@modified  17.10.2026
 ------------------------------------------------------------------------------
 """
 from h3sed.metadata import BytePositions, Store
@@ -160,9 +160,10 @@ def init():
     """Initializes artifacts and creatures for Shadow of Death."""
     Store.add("artifacts", Artifacts, version=PROPS["name"])
     Store.add("artifacts", Artifacts, version=PROPS["name"], category="inventory")
-    for slot in set(sum(ArtifactSlots.values(), [])):
-        Store.add("artifacts", [k for k, v in ArtifactSlots.items() if v[0] == slot],
-                  version=PROPS["name"], category=slot)
+    slotartifacts = {x: [] for slots in ArtifactSlots.values() for x in slots}
+    for name, slots in ArtifactSlots.items(): slotartifacts[slots[0]].append(name)
+    for slot, names in slotartifacts.items():
+        Store.add("artifacts", names, version=PROPS["name"], category=slot)
 
     Store.add("artifact_slots",  ArtifactSlots,  version=PROPS["name"])
     Store.add("artifact_spells", ArtifactSpells, version=PROPS["name"])
@@ -0,0 +1,613 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for hero subplugins.
+
+Hero subplugins import wxPython and step-template at module level, but parsing
+and serializing hero bytes uses neither: if those are not installed,
+tests run with stand-in modules in their place.
+
+------------------------------------------------------------------------------
+This file is part of h3sed - Heroes3 Savegame Editor.
+Released under the MIT License.
+
+@created   17.10.2026
+@modified  17.10.2026
+------------------------------------------------------------------------------
+"""
+import copy
+import os
+import sys
+import types
+import unittest
+try: from unittest import mock  # Py3
+except ImportError: import mock  # Py2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+
+class StandinMeta(type):
+    """Metaclass for stand-in classes, returning mocks for any class attribute."""
+    def __getattr__(cls, name):
+        if name.startswith("__"): raise AttributeError(name)
+        return mock.MagicMock(name=name)
+
+class StandinBase(object):
+    """Stand-in instance, retaining mocks for any attribute."""
+    def __init__(self, *args, **kwargs): pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"): raise AttributeError(name)
+        return self.__dict__.setdefault(name, mock.MagicMock(name=name))
+
+"""Base for stand-in classes like wx.Panel."""
+Standin = StandinMeta("Standin", (StandinBase, ), {})
+
+
+class StandinModule(types.ModuleType):
+    """Stand-in for a GUI toolkit module, providing classes and mocks for any attribute."""
+    __path__ = []
+
+    def __getattr__(self, name):
+        if name.startswith("__"): raise AttributeError(name)
+        if name in ("NewEvent", "NewCommandEvent"):  # wx.lib.newevent
+            value = lambda: (mock.MagicMock(name=name), mock.MagicMock(name=name))
+        elif name[:1].isupper() and not name.isupper():
+            value = StandinMeta(name, (Standin, ), {})
+        else:
+            value = mock.MagicMock(name=name)
+        setattr(self, name, value)
+        return value
+
+
+class StandinFinder(object):
+    """Import hook providing stand-in modules for missing GUI toolkits."""
+    NAMES = ("wx", "step")
+
+    def find_spec(self, fullname, path, target=None):  # Py3
+        if fullname.split(".")[0] not in self.NAMES: return None
+        import importlib.machinery
+        return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+
+    def create_module(self, spec):
+        return StandinModule(spec.name)
+
+    def exec_module(self, module): pass
+
+    def find_module(self, fullname, path=None):  # Py2
+        return self if fullname.split(".")[0] in self.NAMES else None
+
+    def load_module(self, fullname):
+        return sys.modules.setdefault(fullname, StandinModule(fullname))
+
+
+try:
+    import wx
+    import step
+except ImportError:
+    for k in [k for k in sys.modules if k.split(".")[0] in StandinFinder.NAMES]:
+        sys.modules.pop(k)  # Drop any partial imports
+    sys.meta_path.insert(0, StandinFinder())
+    import wx
+
+from h3sed import gui
+from h3sed import metadata
+from h3sed import plugins
+from h3sed.lib import util
+from h3sed.plugins import hero as heroplugin
+
+
+HERO_LENGTH = 1200  # Enough to cover hero positions in all versions
+CATEGORIES  = ["stats", "skills", "army", "artifacts", "inventory", "spells"]
+
+"""Versions with savefile formats to test, as [(version, whether newer format)]."""
+VERSIONS = [("roe", False), ("roe", True), ("ab", False), ("ab", True),
+            ("sod", False), ("hota", False), ("hc", False)]
+
+"""Hero contents written into test hero bytes, as {category: expected state}."""
+HERO = {
+    "stats":     {"attack": 4, "defense": 3, "power": 2, "knowledge": 1, "exp": 5000, "level": 7,
+                  "movement_total": 1500, "movement_left": 1200, "mana": 25,
+                  "spellbook": True, "ballista": True, "ammo": False, "tent": False},
+    "skills":    [{"name": "Wisdom", "level": "Expert"}, {"name": "Logistics", "level": "Basic"}],
+    "army":      [{"name": "Pikeman", "count": 10}, {}, {}, {}, {}, {}, {}],
+    "artifacts": {"helm": "Skull Helmet", "side1": "Spell Scroll: Haste"},
+    "inventory": ["Skull Helmet", None, "Spell Scroll: Haste"] + [None] * 61,
+    "spells":    ["Haste", "Magic Arrow"],
+}
+
+
+class FakeSavefile(object):
+    """Minimal stand-in for metadata.Savefile, with version and format settable by test."""
+
+    def __init__(self, version, newformat=False, raw=None):
+        self.version  = version
+        self.filename = "test"
+        self.raw = self.raw0 = bytearray(HERO_LENGTH) if raw is None else raw
+        self.assume_newformat = newformat
+
+    def match_byte_ranges(self, positions, ranges):
+        return self.assume_newformat
+
+
+class FakeHeroPlugin(object):
+    """Minimal stand-in for hero-plugin as parent of subplugins."""
+    name = "hero"
+
+    def __init__(self, savefile):
+        self.savefile = savefile
+        self._heroes  = []
+        self._index   = {}
+
+
+class FakeSubplugin(object):
+    """Minimal stand-in for hero subplugin, for getting adapted values."""
+    name = "test"
+
+    def __init__(self, parent): self.parent = parent
+
+
+class FakeChoice(object):
+    """Minimal stand-in for artifact slot choice control."""
+
+    def __init__(self): self.Enabled, self.Items, self.StringSelection = True, [], ""
+    def SetItems(self, items): self.Items = list(items)
+    def SetStringSelection(self, value): self.StringSelection = value
+    def Enable(self, enable=True): self.Enabled = enable
+    def Disable(self): self.Enabled = False
+
+
+class FakeBuildPlugin(object):
+    """Minimal stand-in for plugin with controls built by gui.build()."""
+    name = "test"
+
+    def __init__(self, props, state):
+        self.parent = mock.MagicMock(command=lambda callable, name=None: callable())
+        self._props, self._state = props, state
+
+    def props(self): return self._props
+    def state(self): return self._state
+    def item(self):  return None
+
+
+
+def get_pos(savefile):
+    """Returns hero byte positions adapted for savefile version and format."""
+    return plugins.adapt(FakeSubplugin(FakeHeroPlugin(savefile)), "pos", heroplugin.POS)
+
+
+def get_state(category, version):
+    """Returns expected state of test hero bytes for category."""
+    state = copy.deepcopy(HERO[category])
+    if "stats" == category and "hota" == version: state["ballista"] = "Ballista"
+    if "artifacts" == category:
+        savefile = FakeSavefile(version)
+        module = next(p["module"] for p in heroplugin.PLUGINS if "artifacts" == p["name"])
+        plugin = module.factory(savefile, FakeHeroPlugin(savefile), None)
+        state = dict({p["name"]: None for p in plugin.props()}, **state)
+    return state
+
+
+def write_artifact(hero_bytes, pos, name, version):
+    """Writes artifact bytes into hero bytearray: ID + blank, or 8-byte ID if spell scroll."""
+    IDS = metadata.Store.get("ids", version)
+    if name is None: b = metadata.Blank * 4 + metadata.Null * 4
+    elif IDS[name] >> 32: b = util.itoby(IDS[name], 8)
+    else: b = util.itoby(IDS[name], 4) + metadata.Blank * 4
+    hero_bytes[pos:pos + 8] = b
+
+
+def make_hero_bytes(savefile, name="Test"):
+    """Returns test hero bytes for savefile version and format, matching hero regex."""
+    version, POS = savefile.version, get_pos(savefile)
+    IDS = metadata.Store.get("ids", version)
+    result = bytearray(HERO_LENGTH)
+
+    stats = HERO["stats"]
+    for k, length in [("attack", 1), ("defense", 1), ("power", 1), ("knowledge", 1),
+                      ("exp", 4), ("level", 1), ("movement_total", 4), ("movement_left", 4),
+                      ("mana", 2)]:
+        result[POS[k]:POS[k] + length] = util.itoby(stats[k], length)
+    for k, value in [("spellbook", 0), ("ballista", 4), ("ammo", 5), ("tent", 6)]:
+        v = value if stats[k] else util.bytoi(metadata.Blank * 4)
+        result[POS[k]:POS[k] + 8] = util.itoby(v, 4) + metadata.Null * 4
+    for k in ("catapult", ):
+        result[POS[k]:POS[k] + 8] = metadata.Blank * 4 + metadata.Null * 4
+
+    name = name.encode("latin1")
+    result[138:151] = name + metadata.Null * (13 - len(name))
+
+    result[POS["skills_count"]] = len(HERO["skills"])
+    for slot, skill in enumerate(HERO["skills"], 1):
+        result[POS["skills_level"] + IDS[skill["name"]]] = IDS[skill["level"]]
+        result[POS["skills_slot"]  + IDS[skill["name"]]] = slot
+
+    for i, unit in enumerate(HERO["army"]):
+        b1 = util.itoby(IDS[unit["name"]], 4) if unit else metadata.Blank * 4
+        b2 = util.itoby(unit["count"],     4) if unit else metadata.Null  * 4
+        result[POS["army_types"]  + i * 4:POS["army_types"]  + i * 4 + 4] = b1
+        result[POS["army_counts"] + i * 4:POS["army_counts"] + i * 4 + 4] = b2
+
+    for spell in HERO["spells"]:
+        result[POS["spells_book"] + IDS[spell]] = result[POS["spells_available"] + IDS[spell]] = 1
+
+    for k in get_state("artifacts", version):
+        write_artifact(result, POS[k], HERO["artifacts"].get(k), version)
+    for i, item in enumerate(HERO["inventory"]):
+        write_artifact(result, POS["inventory"] + i * 8, item, version)
+    return result
+
+
+def make_plugins(savefile):
+    """Returns {category: subplugin instance} for savefile."""
+    parent = FakeHeroPlugin(savefile)
+    return {p["name"]: p["module"].factory(savefile, parent, None)
+            for p in heroplugin.PLUGINS if p["name"] in CATEGORIES}
+
+
+def load_hero(subplugins, savefile, hero_bytes=None):
+    """Loads hero into all subplugins, as given bytes or test hero bytes; returns hero."""
+    if hero_bytes is None: hero_bytes = make_hero_bytes(savefile)
+    savefile.raw = savefile.raw0 = bytearray(hero_bytes)
+    hero = heroplugin.Hero("Test", bytearray(hero_bytes), 0, (0, len(hero_bytes)), savefile)
+    for category in CATEGORIES:
+        subplugins[category].load(hero, None)
+        hero.state0[category] = copy.deepcopy(subplugins[category].state())
+    return hero
+
+
+
+class TestHeroPlugins(unittest.TestCase):
+    """Tests hero subplugins parsing and serializing hero bytes in all versions."""
+
+    @classmethod
+    def setUpClass(cls):
+        plugins.init()
+        heroplugin.init()
+
+
+    def test_roundtrip(self):
+        """Tests that hero bytes parse to expected state and serialize back unchanged."""
+        for version, newformat in VERSIONS:
+            ctx = (version, newformat)
+            savefile = FakeSavefile(version, newformat)
+            subplugins = make_plugins(savefile)
+            hero = load_hero(subplugins, savefile)
+            hero_bytes = bytearray(hero.bytes)
+
+            result = bytearray(hero_bytes)
+            for category in CATEGORIES:
+                plugin = subplugins[category]
+                self.assertEqual(plugin.state(), get_state(category, version), ctx + (category, ))
+                self.assertEqual(plugin.serialize(), hero_bytes, ctx + (category, ))
+                result = plugin.serialize(out=result)
+                self.assertEqual(result, hero_bytes, ctx + (category, "out"))
+                self.assertEqual(plugin.parse([hero], original=True)[0], plugin.state(), ctx)
+
+
+    def test_edits(self):
+        """Tests that edited state serializes to expected bytes at expected positions."""
+        for version, newformat in VERSIONS:
+            ctx = (version, newformat)
+            savefile = FakeSavefile(version, newformat)
+            subplugins = make_plugins(savefile)
+            hero = load_hero(subplugins, savefile)
+            POS, IDS = get_pos(savefile), metadata.Store.get("ids", version)
+
+            plugin, expected = subplugins["stats"], bytearray(hero.bytes)
+            plugin.state().update(attack=99, exp=70000, mana=300, tent=True)
+            expected[POS["attack"]] = 99
+            expected[POS["exp"]:POS["exp"] + 4] = util.itoby(70000, 4)
+            expected[POS["mana"]:POS["mana"] + 2] = util.itoby(300, 2)
+            expected[POS["tent"]:POS["tent"] + 4] = util.itoby(6, 4)
+            self.assertEqual(plugin.serialize(), expected, ctx + ("stats", ))
+
+            plugin, expected = subplugins["skills"], bytearray(hero.bytes)
+            plugin.state().append({"name": "Archery", "level": "Advanced"})
+            expected[POS["skills_count"]] = 3
+            expected[POS["skills_level"] + IDS["Archery"]] = IDS["Advanced"]
+            expected[POS["skills_slot"]  + IDS["Archery"]] = 3
+            self.assertEqual(plugin.serialize(), expected, ctx + ("skills", ))
+
+            plugin, expected = subplugins["army"], bytearray(hero.bytes)
+            plugin.state()[0], plugin.state()[2] = {}, {"name": "Pikeman", "count": 7}
+            expected[POS["army_types"]:POS["army_types"] + 4] = metadata.Blank * 4
+            expected[POS["army_counts"]:POS["army_counts"] + 4] = metadata.Null * 4
+            expected[POS["army_types"] + 8:POS["army_types"] + 12] = util.itoby(IDS["Pikeman"], 4)
+            expected[POS["army_counts"] + 8:POS["army_counts"] + 12] = util.itoby(7, 4)
+            self.assertEqual(plugin.serialize(), expected, ctx + ("army", ))
+
+            plugin, expected = subplugins["artifacts"], bytearray(hero.bytes)
+            plugin.state().update(helm=None, neck="Amulet of the Undertaker")
+            expected[POS["helm"]:POS["helm"] + 8] = metadata.Blank * 8
+            write_artifact(expected, POS["neck"], "Amulet of the Undertaker", version)
+            self.assertEqual(plugin.serialize(), expected, ctx + ("artifacts", ))
+
+            plugin, expected = subplugins["inventory"], bytearray(hero.bytes)
+            plugin.state()[0], plugin.state()[5] = None, "Spell Scroll: Bless"
+            expected[POS["inventory"]:POS["inventory"] + 8] = metadata.Blank * 4 + metadata.Null * 4
+            write_artifact(expected, POS["inventory"] + 40, "Spell Scroll: Bless", version)
+            self.assertEqual(plugin.serialize(), expected, ctx + ("inventory", ))
+
+            plugin, expected = subplugins["spells"], bytearray(hero.bytes)
+            self.assertTrue(plugin.on_add(None, "Bless"))
+            self.assertFalse(plugin.on_add(None, "Bless"))
+            self.assertEqual(plugin.state(), ["Bless", "Haste", "Magic Arrow"], ctx)
+            expected[POS["spells_book"] + IDS["Bless"]] = 1
+            expected[POS["spells_available"] + IDS["Bless"]] = 1
+            self.assertEqual(plugin.serialize(), expected, ctx + ("spells", ))
+
+
+    def test_inventory_position(self):
+        """Tests that inventory starts at side5 slot in older RoE and AB savefile formats."""
+        for version, newformat in VERSIONS:
+            POS = get_pos(FakeSavefile(version, newformat))
+            older = version in ("roe", "ab") and not newformat
+            self.assertEqual(POS["inventory"], 495 if older else 503, (version, newformat))
+            self.assertEqual("side5" in POS, version not in ("roe", "ab"), (version, newformat))
+            self.assertEqual("reserved" in POS, version not in ("roe", "ab"), (version, newformat))
+
+
+    def test_artifact_combos(self):
+        """Tests combination artifacts setting reserved slot flags, as counts per slot."""
+        for version in ("sod", "hota"):
+            savefile = FakeSavefile(version)
+            subplugins = make_plugins(savefile)
+            hero = load_hero(subplugins, savefile)
+            plugin, POS = subplugins["artifacts"], get_pos(savefile)
+            RESERVED = POS["reserved"]
+
+            state = dict(plugin.state(), helm=None, weapon="Angelic Alliance",
+                         side1="Elixir of Life", side2="Bow of the Sharpshooter")
+            self.assertTrue(plugin.load_state(state))
+            self.assertEqual(plugin.state(), state, version)
+            result, expected = plugin.serialize(), bytearray(hero.bytes)
+            expected[POS["helm"]:POS["helm"] + 8] = metadata.Blank * 8
+            for k in ("weapon", "side1", "side2"):
+                write_artifact(expected, POS[k], state[k], version)
+            counts = {"helm": 1, "neck": 1, "armor": 1, "shield": 1, "feet": 1,
+                      "hand": 2, "side": 2}
+            for slot, pos in RESERVED.items():
+                expected[pos] = counts.get(slot, 0)
+            self.assertEqual(result, expected, version)
+
+            # Unknown flag values are retained unless slot is taken by combination artifact
+            hero_bytes = bytearray(hero.get_bytes(original=True))
+            hero_bytes[RESERVED["cloak"]] = hero_bytes[RESERVED["neck"]] = 7
+            hero = load_hero(subplugins, savefile, hero_bytes)
+            self.assertEqual(plugin.serialize(), hero_bytes, version)
+            plugin.state()["helm"] = "Admiral's Hat"
+            result = plugin.serialize()
+            self.assertEqual((result[RESERVED["cloak"]], result[RESERVED["neck"]]), (7, 1), version)
+
+        for version, newformat in [("roe", False), ("roe", True), ("ab", False)]:
+            savefile = FakeSavefile(version, newformat)
+            subplugins = make_plugins(savefile)
+            hero = load_hero(subplugins, savefile)
+            plugin = subplugins["artifacts"]
+            self.assertFalse(plugin._combos, (version, newformat))
+            plugin.state()["helm"] = None
+            result = plugin.serialize()
+            self.assertEqual(result[1000:], hero.bytes[1000:], (version, newformat))
+
+
+    def test_artifact_overflow(self):
+        """Tests that combination artifacts cannot overfill slots."""
+        savefile = FakeSavefile("sod")
+        subplugins = make_plugins(savefile)
+        load_hero(subplugins, savefile)
+        plugin = subplugins["artifacts"]
+        props = {p["name"]: p for p in plugin.props()}
+
+        # Statue of Legion takes all side slots: items in earlier slots get dropped
+        state = dict(plugin.state(), side2="Statue of Legion")
+        with mock.patch.object(sys.modules[type(plugin).__module__].logger, "warning") as m:
+            self.assertTrue(plugin.load_state(state))
+            self.assertTrue(m.called)
+        self.assertEqual((plugin.state()["side1"], plugin.state()["side2"]),
+                         (None, "Statue of Legion"))
+
+        slots_free, slots_owner = plugin._slots(props["side1"], "Spell Scroll: Haste")
+        self.assertEqual(slots_free["side"], -1)
+        self.assertEqual(slots_owner["side"], set(["Statue of Legion"]))
+        slots_free, slots_owner = plugin._slots(props["side2"], "Spell Scroll: Haste")
+        self.assertEqual((slots_free["side"], "side" in slots_owner), (4, False))
+
+        plugin.load_state(dict(plugin.state(), side2=None, weapon="Angelic Alliance"))
+        slots_free, slots_owner = plugin._slots(props["helm"], "Skull Helmet")
+        self.assertEqual(slots_free["helm"], -1)
+        self.assertEqual(slots_owner["helm"], set(["Angelic Alliance"]))
+        slots_free, slots_owner = plugin._slots(props["weapon"], None)
+        self.assertEqual((slots_free["helm"], "helm" in slots_owner), (1, False))
+        self.assertEqual(plugin._slots(props["weapon"], None), plugin._slots(props["weapon"]))
+
+
+    def test_artifact_taken_slots(self):
+        """Tests that slots taken by combination artifacts name the first owner in slot order."""
+        savefile = FakeSavefile("sod")
+        subplugins = make_plugins(savefile)
+        load_hero(subplugins, savefile)
+        plugin = subplugins["artifacts"]
+        plugin._panel = mock.MagicMock()
+        plugin._ctrls = {p["name"]: FakeChoice() for p in plugin.props()}
+
+        state = dict(plugin.state(), side1="Elixir of Life", side2="Bow of the Sharpshooter",
+                     side3="Badge of Courage")
+        self.assertTrue(plugin.load_state(state))
+        plugin.update_slots()
+        for name in ("lefthand", "righthand", "side4", "side5"):
+            ctrl = plugin._ctrls[name]
+            self.assertEqual(ctrl.StringSelection, "<taken by Elixir of Life>", name)
+            self.assertFalse(ctrl.Enabled, name)
+        self.assertTrue(plugin._ctrls["helm"].Enabled)
+
+        plugin.state()["side1"] = None
+        plugin.update_slots()
+        for name in ("lefthand", "righthand"):
+            self.assertTrue(plugin._ctrls[name].Enabled, name)
+        self.assertEqual(plugin._ctrls["side1"].StringSelection, "")
+
+
+    def test_hero_regex(self):
+        """Tests finding hero structs in savefile, skipping campaign heroes at front."""
+        for version, newformat in VERSIONS:
+            ctx = (version, newformat)
+            savefile = FakeSavefile(version, newformat)
+            parent = FakeHeroPlugin(savefile)
+            blobs = [make_hero_bytes(savefile, name) for name in ("Decoy", "Test", "Yog")]
+            raw = bytearray(1000) + blobs[0] + bytearray(30000) + blobs[1] + bytearray(300) + \
+                  blobs[2] + bytearray(3000)
+            savefile.raw = savefile.raw0 = raw
+            parse = getattr(heroplugin.HeroPlugin.parse, "__func__", heroplugin.HeroPlugin.parse)
+            parse(parent)
+
+            self.assertEqual([h.name for h in parent._heroes], ["Test", "Yog"], ctx)
+            start = 1000 + HERO_LENGTH + 30000
+            self.assertEqual(parent._heroes[0].span[0], start, ctx)
+            self.assertEqual(parent._heroes[1].span[0], start + HERO_LENGTH + 300, ctx)
+            for hero in parent._heroes:
+                self.assertEqual(hero.bytes, raw[hero.span[0]:hero.span[1]], ctx)
+                self.assertEqual(hero.get_bytes(original=True), hero.bytes, ctx)
+                subplugins = {p["name"]: p["module"].factory(savefile, parent, None)
+                              for p in heroplugin.PLUGINS if p["name"] in CATEGORIES}
+                for category in ("skills", "army", "spells"):
+                    plugin = subplugins[category]
+                    plugin.load(hero, None)
+                    self.assertEqual(plugin.state(), get_state(category, version), ctx)
+
+            # Heroes further than search window from last hero are not searched for
+            raw[start + HERO_LENGTH:start + HERO_LENGTH] = bytearray(5000)
+            parse(parent)
+            self.assertEqual([h.name for h in parent._heroes], ["Test"], ctx)
+
+
+    def test_savefile_magic(self):
+        """Tests Heroes Chronicles savefile magic added to regex as alternative."""
+        RGX = plugins.adapt(None, "savefile_magic_regex", metadata.Savefile.RGX_MAGIC)
+        for raw in (b"H3SVG", b"H3SVC", b"HCHRONSVG"):
+            self.assertTrue(RGX.match(raw + b"\x00" * 10), raw)
+        self.assertFalse(RGX.match(b"\x00HCHRONSVG"))
+        self.assertIs(plugins.adapt(None, "savefile_magic_regex", metadata.Savefile.RGX_MAGIC),
+                      RGX)
+
+
+    def test_original_bytes(self):
+        """Tests that original hero bytes come from savefile as loaded, not current hero bytes."""
+        savefile = FakeSavefile("sod")
+        subplugins = make_plugins(savefile)
+        hero = load_hero(subplugins, savefile)
+        hero_bytes = bytearray(hero.bytes)
+        hero.bytes[:] = bytearray(len(hero.bytes))
+        savefile.raw = bytearray(len(savefile.raw0))  # As if patched
+        result = hero.get_bytes(original=True)
+        self.assertEqual(result, hero_bytes)
+        result[0] = 255
+        self.assertEqual(hero.get_bytes(original=True), hero_bytes)
+        self.assertEqual(subplugins["skills"].parse([hero])[0], [])
+        self.assertEqual(subplugins["skills"].parse([hero], original=True)[0], HERO["skills"])
+
+
+
+class TestBuild(unittest.TestCase):
+    """Tests building controls for plugin props, like artifact slot choices."""
+
+    @classmethod
+    def setUpClass(cls):
+        plugins.init()
+        heroplugin.init()
+
+
+    def setUp(self):
+        if isinstance(wx, StandinModule): self.panel = wx.ScrolledWindow()
+        else:
+            self.app = wx.App()
+            self.frame = wx.Frame(None)
+            self.panel = wx.ScrolledWindow(self.frame)
+
+    def tearDown(self):
+        if not isinstance(wx, StandinModule): self.frame.Destroy()
+
+
+    def get_selection(self, ctrl):
+        """Returns string selected in choice control."""
+        if not isinstance(wx, StandinModule): return ctrl.StringSelection
+        return ctrl.SetStringSelection.call_args[0][0]
+
+
+    def select(self, ctrl, value):
+        """Selects string in choice control and fires choice event."""
+        if isinstance(wx, StandinModule):
+            ctrl.StringSelection = value
+            eventtype, handler = ctrl.Bind.call_args[0]
+            self.assertIs(eventtype, wx.EVT_CHOICE)
+            handler(mock.MagicMock(EventObject=ctrl))
+        else:
+            ctrl.SetStringSelection(value)
+            event = wx.CommandEvent(wx.wxEVT_CHOICE, ctrl.Id)
+            event.SetEventObject(ctrl)
+            ctrl.GetEventHandler().ProcessEvent(event)
+
+
+    def test_choice(self):
+        """Tests choice props as top-level props and as itemlist columns."""
+        module = next(p["module"] for p in heroplugin.PLUGINS if "artifacts" == p["name"])
+        self.assertEqual(set(p["type"] for p in module.UIPROPS), set(["choice"]))
+
+        choices = ["Skull Helmet", "Helm of Chaos"]
+        props = [{"name": "helm", "type": "choice", "choices": choices, "nullable": True}]
+        plugin = FakeBuildPlugin(props, {"helm": "Skull Helmet"})
+        ctrl = gui.build(plugin, self.panel)["helm"]
+        self.assertIsInstance(ctrl, wx.Choice)
+        self.assertEqual(self.get_selection(ctrl), "Skull Helmet")
+        self.select(ctrl, "Helm of Chaos")
+        self.assertEqual(plugin.state(), {"helm": "Helm of Chaos"})
+
+        item = {"name": "name", "type": "choice", "choices": ["Pikeman", "Archer"]}
+        props = [{"name": "army", "type": "itemlist", "item": [item]}]
+        plugin = FakeBuildPlugin(props, [{"name": "Pikeman"}, {"name": "Archer"}])
+        ctrls = [x["name"] for x in gui.build(plugin, self.panel)[0]]
+        self.assertTrue(all(isinstance(x, wx.Choice) for x in ctrls))
+        self.assertEqual([self.get_selection(x) for x in ctrls], ["Pikeman", "Archer"])
+        self.select(ctrls[1], "Pikeman")
+        self.assertEqual(plugin.state(), [{"name": "Pikeman"}, {"name": "Pikeman"}])
+
+
+
+class TestVersionChange(unittest.TestCase):
+    """Tests reparsing heroes in the same subplugins after savefile version changes."""
+
+    @classmethod
+    def setUpClass(cls):
+        plugins.init()
+        heroplugin.init()
+
+
+    def test_reparse(self):
+        """Tests that props and serialized bytes follow savefile version on reparse."""
+        savefile = FakeSavefile("sod")
+        subplugins = make_plugins(savefile)
+        load_hero(subplugins, savefile)
+        for category in CATEGORIES: subplugins[category].serialize()
+
+        for version, newformat in [("hota", False), ("roe", True), ("roe", False),
+                                   ("ab", False), ("roe", True), ("sod", False)]:
+            ctx = (version, newformat)
+            savefile.version, savefile.assume_newformat = version, newformat
+            hero = load_hero(subplugins, savefile)
+            fresh = make_plugins(savefile)
+            load_hero(fresh, savefile)
+            for category in CATEGORIES:
+                plugin, plugin2 = subplugins[category], fresh[category]
+                self.assertEqual(plugin.state(), plugin2.state(), ctx + (category, ))
+                self.assertEqual(plugin.state(), get_state(category, version), ctx + (category, ))
+                self.assertEqual(plugin.serialize(), hero.bytes, ctx + (category, ))
+                self.assertEqual(plugin.serialize(), plugin2.serialize(), ctx + (category, ))
+
+            skills = subplugins["skills"].props()[0]["choices"]
+            self.assertEqual(skills, sorted(metadata.Store.get("skills", version)))
+            item = next(x for x in subplugins["army"].props()[0]["item"] if "choices" in x)
+            creatures = item["choices"]
+            self.assertEqual(creatures, sorted(metadata.Store.get("creatures", version)))
+
+
+if "__main__" == __name__:
+    unittest.main()